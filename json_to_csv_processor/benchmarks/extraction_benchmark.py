@@ -0,0 +1,113 @@
+"""
+Extraction benchmark for ProductAttributeExtractor.
+
+Compares the previous extraction path (``json.dumps`` of the fetched object fed
+into an unbounded ``lru_cache``, then decoded again) with ``extract_attributes``
+on already-parsed objects and on raw response bytes. Reports per-product
+throughput and the memory retained after each run, measured with tracemalloc.
+
+Usage:
+    python benchmarks/extraction_benchmark.py [--products N]
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from functools import lru_cache
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import DigestCache, ProductAttributeExtractor  # noqa: E402
+
+
+def make_product(i: int) -> dict:
+    custom_attributes = {
+        "allergens": {"value": [{"name": "Milk"}, {"name": "Soy"}]},
+        "sku": {"value": f"SKU-{i:08d}"},
+        "vegan": {"value": False},
+        "kosher": {"value": True},
+        "organic": {"value": i % 2 == 0},
+        "vegetarian": {"value": True},
+        "gluten_free": {"value": False},
+        "lactose_free": {"value": False},
+        "package_quantity": {"value": 1 + i % 12},
+        "unit_size": {"value": "500"},
+        "net_weight": {"value": "500"},
+    }
+    return {
+        "id": i,
+        "name": f"Product {i}",
+        "description": "Lorem ipsum dolor sit amet. " * 20,
+        "allVariants": [{
+            "sku": f"SKU-{i:08d}",
+            "attributesRaw": [
+                {"name": "brand", "value": "Brand"},
+                {"name": "custom_attributes", "value": {"es-CR": json.dumps(custom_attributes)}},
+            ],
+        }],
+    }
+
+
+@lru_cache(maxsize=None)
+def legacy_extract(data: str) -> dict:
+    parsed_data = json.loads(data)
+    attributes_raw = next(
+        attr for attr in parsed_data['allVariants'][0]['attributesRaw']
+        if attr['name'] == 'custom_attributes'
+    )
+    return json.loads(attributes_raw['value']['es-CR'])
+
+
+def legacy(product):
+    return ProductAttributeExtractor.parse(legacy_extract(json.dumps(product)))
+
+
+def run(name, func, inputs):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    for item in inputs:
+        func(item)
+    elapsed = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<28} {len(inputs) / elapsed:>10,.0f} products/s  "
+        f"{elapsed / len(inputs) * 1e6:>7.1f} us/product  "
+        f"retained {retained / 1e6:>7.2f} MB  peak {peak / 1e6:>7.2f} MB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--products", type=int, default=20000)
+    args = parser.parse_args()
+
+    products = [make_product(i) for i in range(args.products)]
+    bodies = [json.dumps(product).encode() for product in products]
+
+    run("legacy (dumps + lru_cache)", legacy, products)
+    legacy_extract.cache_clear()
+
+    ProductAttributeExtractor.cache = DigestCache(128)
+    run("extract_attributes(dict)", ProductAttributeExtractor.extract_attributes, products)
+    ProductAttributeExtractor.cache = DigestCache(128)
+    run("extract_attributes(bytes)", ProductAttributeExtractor.extract_attributes, bodies)
+
+    print("\nRetained memory as the number of products grows (flat means bounded):")
+    extract = ProductAttributeExtractor.extract_attributes
+    for count in (args.products // 4, args.products // 2, args.products):
+        ProductAttributeExtractor.cache = DigestCache(128)
+        legacy_extract.cache_clear()
+        run(f"  legacy        n={count}", legacy, products[:count])
+        run(f"  extract(dict) n={count}", extract, products[:count])
+
+
+if __name__ == "__main__":
+    main()
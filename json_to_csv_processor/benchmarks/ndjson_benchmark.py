@@ -0,0 +1,99 @@
+"""
+Sharded NDJSON benchmark for ShardedNDJSONProcessor.
+
+Generates a synthetic NDJSON dump (one product per line) of the requested size,
+then converts it to CSV with an increasing number of worker processes and
+reports the throughput in MB/s for each and the speedup over the first worker
+count, so the scaling with cores is visible. Scaling can only be measured up to
+the number of CPUs available to the process, which is printed first.
+
+Usage:
+    python benchmarks/ndjson_benchmark.py [--size-mb 1024] [--fixture PATH] [--workers 1,2,4]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extraction_benchmark import make_product  # noqa: E402
+from main import ShardedNDJSONProcessor  # noqa: E402
+
+
+def generate_fixture(path: Path, size_mb: int):
+    target = size_mb * 1024 * 1024
+    written = 0
+    with path.open('w') as f:
+        i = 0
+        while written < target:
+            chunk = "".join(json.dumps(make_product(i + j)) + "\n" for j in range(1000))
+            f.write(chunk)
+            written += len(chunk)
+            i += 1000
+
+
+def available_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def run(fixture: Path, output: Path, workers: int) -> float:
+    start = time.perf_counter()
+    summary = asyncio.run(ShardedNDJSONProcessor(fixture, output, workers=workers).process())
+    elapsed = time.perf_counter() - start
+    size_mb = fixture.stat().st_size / 1e6
+    print(
+        f"{workers:>3} workers  {size_mb:>9,.0f} MB  {summary.succeeded:>10,} products  "
+        f"{elapsed:>7.1f}s  {size_mb / elapsed:>7.1f} MB/s",
+        end="",
+    )
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--fixture", type=Path, help="Reuse (or create) the fixture at this path")
+    parser.add_argument(
+        "--workers", default=None,
+        help="Comma-separated worker counts (default: powers of two up to the CPU count)",
+    )
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    cpus = available_cpus()
+    print(f"{cpus} CPUs available")
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(",")]
+    else:
+        worker_counts = [1 << i for i in range(cpus.bit_length()) if 1 << i <= cpus]
+        if worker_counts[-1] != cpus:
+            worker_counts.append(cpus)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture = args.fixture or Path(tmp) / "dump.ndjson"
+        if not fixture.exists():
+            print(f"Generating {args.size_mb} MB fixture at {fixture}...")
+            generate_fixture(fixture, args.size_mb)
+        output = Path(tmp) / "dump.csv"
+
+        baseline = None
+        for workers in worker_counts:
+            elapsed = run(fixture, output, workers)
+            baseline = baseline or elapsed
+            print(f"  {baseline / elapsed:>5.2f}x")
+        os.remove(output)
+
+
+if __name__ == "__main__":
+    main()
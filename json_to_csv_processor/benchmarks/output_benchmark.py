@@ -0,0 +1,95 @@
+"""
+Output benchmark for the CSV and columnar writers.
+
+Writes the same rows with the previous CSV path (a ``csv.DictWriter`` fed with
+``asdict`` of every row), with ``CSVStreamWriter`` and with ``ColumnarWriter``
+in Parquet and Arrow format. Reports throughput in rows/s and the size of each
+output file.
+
+Usage:
+    python benchmarks/output_benchmark.py [--rows 1000000] [--row-group-size 65536]
+"""
+
+import argparse
+import csv
+import logging
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from models import ProductAttributes  # noqa: E402
+from output_writers import ColumnarWriter, CSVStreamWriter, OutputWriter  # noqa: E402
+
+
+def make_attributes(i: int) -> ProductAttributes:
+    return ProductAttributes(
+        allergens=["Milk", "Soy"][:i % 3],
+        sku=f"SKU-{i:08d}",
+        kosher=True,
+        organic=i % 2 == 0,
+        vegetarian=True,
+        package_quantity=Decimal(1 + i % 12),
+        unit_size=Decimal("500"),
+        net_weight=Decimal("0.75"),
+    )
+
+
+def legacy_write(rows, output_file: Path):
+    with output_file.open('w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=OutputWriter.fieldnames)
+        writer.writeheader()
+        for source_url, attributes in rows:
+            writer.writerow({'source_url': source_url, **asdict(attributes), 'error': ''})
+
+
+def writer_write(rows, writer: OutputWriter):
+    with writer:
+        for source_url, attributes in rows:
+            writer.write(source_url, attributes)
+
+
+def report(name: str, elapsed: float, count: int, output_file: Path):
+    size_mb = output_file.stat().st_size / 1e6
+    print(f"{name:<10} {count / elapsed:>12,.0f} rows/s  {elapsed:>6.2f}s  {size_mb:>8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--row-group-size", type=int, default=1 << 16)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    distinct = [make_attributes(i) for i in range(1000)]
+    rows = [
+        (f"https://example.com/products/{i}.json", distinct[i % 1000]) for i in range(args.rows)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = Path(tmp) / "legacy.csv"
+        start = time.perf_counter()
+        legacy_write(rows, output_file)
+        report("legacy", time.perf_counter() - start, len(rows), output_file)
+
+        output_file = Path(tmp) / "products.csv"
+        start = time.perf_counter()
+        writer_write(rows, CSVStreamWriter(output_file))
+        report("csv", time.perf_counter() - start, len(rows), output_file)
+
+        for output_format in ColumnarWriter.FORMATS:
+            output_file = Path(tmp) / f"products.{output_format}"
+            writer = ColumnarWriter(output_file, output_format, row_group_size=args.row_group_size)
+            start = time.perf_counter()
+            writer_write(rows, writer)
+            report(output_format, time.perf_counter() - start, len(rows), output_file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Streaming ingestion benchmark for StreamingProductProcessor.
+
+Generates a synthetic catalog export (``{"results": [product, ...]}``) of the
+requested size, then converts it to CSV in a fresh process and reports the
+throughput in MB/s and the peak RSS of that process. With ``--buffered`` the
+same file is also processed the old way (whole document loaded with
+``json.load``) for comparison; avoid that on multi-GB fixtures.
+
+Usage:
+    python benchmarks/streaming_benchmark.py [--size-mb 2048] [--fixture PATH] [--buffered]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from extraction_benchmark import make_product  # noqa: E402
+
+STREAMING_SNIPPET = """
+import asyncio, logging, resource, sys, time
+from pathlib import Path
+sys.path.insert(0, {root!r})
+logging.disable(logging.CRITICAL)
+from main import StreamingProductProcessor
+start = time.perf_counter()
+processor = StreamingProductProcessor({fixture!r}, Path({output!r}), items_key="results")
+summary = asyncio.run(processor.process())
+elapsed = time.perf_counter() - start
+print(elapsed, summary.succeeded, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+BUFFERED_SNIPPET = """
+import json, logging, resource, sys, time
+from pathlib import Path
+sys.path.insert(0, {root!r})
+logging.disable(logging.CRITICAL)
+from main import ProductAttributeExtractor
+from output_writers import CSVStreamWriter
+start = time.perf_counter()
+with open({fixture!r}, 'rb') as f:
+    products = json.load(f)["results"]
+with CSVStreamWriter(Path({output!r})) as writer:
+    for product in products:
+        writer.write("", ProductAttributeExtractor.extract_attributes(product))
+elapsed = time.perf_counter() - start
+print(elapsed, len(products), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def generate_fixture(path: Path, size_mb: int):
+    target = size_mb * 1024 * 1024
+    written = 0
+    with path.open('w') as f:
+        f.write('{"count": null, "results": [')
+        i = 0
+        while written < target:
+            chunk = ",".join(json.dumps(make_product(i + j)) for j in range(1000))
+            if i:
+                f.write(",")
+            f.write(chunk)
+            written += len(chunk)
+            i += 1000
+        f.write(']}')
+
+
+def run(name: str, snippet: str, fixture: Path, output: Path):
+    root = str(Path(__file__).resolve().parent.parent)
+    completed = subprocess.run(
+        [sys.executable, "-c", snippet.format(root=root, fixture=str(fixture), output=str(output))],
+        capture_output=True, text=True, check=True,
+    )
+    elapsed, products, max_rss_kb = completed.stdout.split()
+    size_mb = fixture.stat().st_size / 1e6
+    print(
+        f"{name:<10} {size_mb:>9,.0f} MB  {int(products):>10,} products  {float(elapsed):>7.1f}s  "
+        f"{size_mb / float(elapsed):>7.1f} MB/s  peak RSS {int(max_rss_kb) / 1024:>8.1f} MB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--size-mb", type=int, default=2048)
+    parser.add_argument("--fixture", type=Path, help="Reuse (or create) the fixture at this path")
+    parser.add_argument("--buffered", action="store_true", help="Also run the json.load baseline")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture = args.fixture or Path(tmp) / "catalog.json"
+        if not fixture.exists():
+            print(f"Generating {args.size_mb} MB fixture at {fixture}...")
+            generate_fixture(fixture, args.size_mb)
+        output = Path(tmp) / "catalog.csv"
+
+        run("streaming", STREAMING_SNIPPET, fixture, output)
+        if args.buffered:
+            run("buffered", BUFFERED_SNIPPET, fixture, output)
+        os.remove(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Checkpoint index making batch exports incremental and resumable.
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+from output_writers import CSVStreamWriter
+
+@dataclass
+class Checkpoint:
+    """What the checkpoint index knows about one source URL."""
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    digest: Optional[str] = None
+    run_id: Optional[int] = None
+    output_run_id: Optional[int] = None
+    output_offset: Optional[int] = None
+
+class CheckpointIndex:
+    """
+    Persistent index of exported products, stored in SQLite.
+
+    For every source URL it records the HTTP validators (ETag and
+    Last-Modified) and the BLAKE2b digest of the last exported body, the last
+    run that processed the URL, and where its latest row is: the run that
+    wrote it and the byte offset at which the row starts in that run's output.
+    Runs are recorded too, with the output size covered by their last commit,
+    so a run that did not finish is resumed by the next run writing to the
+    same output file.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            output_file TEXT NOT NULL,
+            output_offset INTEGER NOT NULL DEFAULT 0,
+            started_at REAL NOT NULL,
+            finished_at REAL
+        );
+        CREATE TABLE IF NOT EXISTS checkpoints (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            digest TEXT,
+            run_id INTEGER,
+            output_run_id INTEGER,
+            output_offset INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS checkpoints_run_id ON checkpoints (run_id);
+        CREATE INDEX IF NOT EXISTS checkpoints_output_run_id ON checkpoints (output_run_id);
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._connection = sqlite3.connect(str(path))
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(self.SCHEMA)
+
+    def begin_run(self, output_file: Path) -> Tuple[int, Optional[int]]:
+        """
+        Starts a run writing to `output_file`, or resumes the unfinished one.
+
+        Args:
+            output_file (Path): The output file of the run.
+
+        Returns:
+            Tuple[int, Optional[int]]: The run id and, when resuming, the output
+            size covered by the last commit of that run.
+        """
+        output_path = str(output_file.resolve())
+        row = self._connection.execute(
+            'SELECT id, output_offset FROM runs WHERE output_file = ? AND finished_at IS NULL '
+            'ORDER BY id DESC LIMIT 1',
+            (output_path,),
+        ).fetchone()
+        if row is not None:
+            return row[0], row[1]
+        with self._connection:
+            cursor = self._connection.execute(
+                'INSERT INTO runs (output_file, started_at) VALUES (?, ?)',
+                (output_path, time.time()),
+            )
+        return cursor.lastrowid, None
+
+    def finish_run(self, run_id: int):
+        """Marks a run as complete, so the next run starts afresh."""
+        with self._connection:
+            self._connection.execute(
+                'UPDATE runs SET finished_at = ? WHERE id = ?', (time.time(), run_id)
+            )
+
+    def abandon_run(self, run_id: int):
+        """
+        Closes an unfinished run whose output was lost.
+
+        The products whose latest row was in that output lose their validators
+        and digest, so the next run fetches and exports them again.
+        """
+        with self._connection:
+            self._connection.execute(
+                'UPDATE checkpoints SET etag = NULL, last_modified = NULL, digest = NULL, '
+                'output_run_id = NULL, output_offset = NULL WHERE output_run_id = ?',
+                (run_id,),
+            )
+            self._connection.execute(
+                'UPDATE runs SET finished_at = ? WHERE id = ?', (time.time(), run_id)
+            )
+
+    def get(self, url: str) -> Optional[Checkpoint]:
+        """Returns the checkpoint of a URL, or None if it was never processed."""
+        row = self._connection.execute(
+            'SELECT url, etag, last_modified, digest, run_id, output_run_id, output_offset '
+            'FROM checkpoints WHERE url = ?',
+            (url,),
+        ).fetchone()
+        return Checkpoint(*row) if row is not None else None
+
+    def processed_urls(self, run_id: int) -> Set[str]:
+        """Returns the URLs already committed by a run."""
+        rows = self._connection.execute('SELECT url FROM checkpoints WHERE run_id = ?', (run_id,))
+        return {url for url, in rows}
+
+    def commit(self, run_id: int, checkpoints: Iterable[Checkpoint], output_offset: int):
+        """Stores checkpoints and the output size they cover in one transaction."""
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO checkpoints '
+                '(url, etag, last_modified, digest, run_id, output_run_id, output_offset) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (
+                        c.url, c.etag, c.last_modified, c.digest, c.run_id, c.output_run_id,
+                        c.output_offset,
+                    )
+                    for c in checkpoints
+                ],
+            )
+            self._connection.execute(
+                'UPDATE runs SET output_offset = ? WHERE id = ?', (output_offset, run_id)
+            )
+
+    def close(self):
+        self._connection.close()
+
+class CheckpointRun:
+    """
+    Buffers the checkpoints of a run and commits them every `interval` products.
+
+    Each commit first syncs the output file, so the index never refers to a row
+    that is not on disk. Rows written after the last commit are discarded when
+    the run is resumed, and their URLs are processed again.
+    """
+
+    def __init__(
+        self, index: CheckpointIndex, run_id: int, writer: CSVStreamWriter, interval: int = 100
+    ):
+        self.index = index
+        self.run_id = run_id
+        self.writer = writer
+        self.interval = interval
+        self._pending: List[Checkpoint] = []
+
+    def record(self, checkpoint: Checkpoint):
+        """Adds the checkpoint of a processed URL."""
+        self._pending.append(checkpoint)
+        if len(self._pending) >= self.interval:
+            self.commit()
+
+    def commit(self):
+        """Syncs the output file and stores the pending checkpoints."""
+        if not self._pending:
+            return
+        output_offset = self.writer.sync()
+        checkpoints, self._pending = self._pending, []
+        self.index.commit(self.run_id, checkpoints, output_offset)
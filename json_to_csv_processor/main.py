@@ -10,23 +10,56 @@ Usage:
 Environment Variables:
     JSON_URL: URL of the JSON data source
     OUTPUT_FILE: Path to the output CSV file
+    JSON_URLS_FILE: File with one product URL per line (enables batch mode)
+    JSON_URLS: Comma-separated product URLs (enables batch mode)
+    MAX_CONNECTIONS: Maximum concurrent connections in batch mode
+    MAX_RETRIES: Retries per URL for transient errors in batch mode
+    RATE_LIMIT: Maximum requests per second in batch mode
+    CACHE_SIZE: Maximum number of memoized product extractions (0 disables caching)
+    STREAM_SOURCE: URL or file path of a catalog export to stream (enables stream mode)
+    STREAM_ITEMS_KEY: Top-level key holding the product array in the export, if any
+    STREAM_CHUNK_SIZE: Bytes read per chunk in stream mode
+    NDJSON_SOURCE: Local NDJSON dump to process across cores (enables sharded mode)
+    WORKERS: Number of worker processes in sharded mode (defaults to the CPU count)
+    OUTPUT_FORMAT: csv, parquet or arrow (defaults to the OUTPUT_FILE extension)
+    ROW_GROUP_SIZE: Rows buffered per Parquet row group / Arrow record batch
+    CHECKPOINT_DB: SQLite checkpoint index making batch runs incremental and resumable
+    CHECKPOINT_INTERVAL: Products processed between checkpoint commits
 """
 
 import asyncio
+import itertools
 import csv
+import hashlib
 import json
+import mmap
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List
-from decimal import Decimal
+from typing import (
+    Dict, Any, List, AsyncIterator, Awaitable, Callable, Iterable, Optional, Set, Tuple,
+    TypeVar, Union
+)
+from decimal import Decimal, InvalidOperation
 import logging
-from dataclasses import dataclass, asdict, field
-from functools import lru_cache
+from dataclasses import dataclass, replace
 
 import aiohttp # type: ignore
 from aiohttp import ClientSession # type: ignore
 from dotenv import load_dotenv # type: ignore
 import os
 
+from checkpoints import Checkpoint, CheckpointIndex, CheckpointRun
+from models import ProductAttributes
+from output_writers import (
+    ColumnarWriter, CSVStreamWriter, OutputWriter, open_output_writer, read_record_batches,
+    resolve_output_format,
+)
+from stream_parser import JSONArrayStreamParser, aiter_products, iter_file_chunks, iter_products
+
 # Load environment variables
 load_dotenv()
 
@@ -34,20 +67,7 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass(frozen=True)
-class ProductAttributes:
-    """Represents the attributes of a product."""
-    allergens: List[str] = field(default_factory=list)
-    sku: str = ""
-    vegan: bool = False
-    kosher: bool = False
-    organic: bool = False
-    vegetarian: bool = False
-    gluten_free: bool = False
-    lactose_free: bool = False
-    package_quantity: Decimal = Decimal('0')
-    unit_size: Decimal = Decimal('0')
-    net_weight: Decimal = Decimal('0')
+T = TypeVar('T')
 
 class JSONFetcher:
     """Handles fetching JSON data from a URL."""
@@ -75,33 +95,309 @@ class JSONFetcher:
             logger.error(f"Error fetching JSON data: {e}")
             raise
 
+    @staticmethod
+    async def stream(
+        url: str, session: ClientSession, chunk_size: int = 1 << 16
+    ) -> AsyncIterator[bytes]:
+        """
+        Yields the response body in chunks as it arrives, without buffering it.
+
+        Args:
+            url (str): The URL to fetch data from.
+            session (ClientSession): The aiohttp ClientSession to use for the request.
+            chunk_size (int): Maximum size of each chunk in bytes.
+
+        Raises:
+            aiohttp.ClientError: If there's an error fetching the data.
+        """
+        try:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    yield chunk
+        except aiohttp.ClientError as e:
+            logger.error(f"Error streaming JSON data: {e}")
+            raise
+
+    @staticmethod
+    async def fetch_conditional(
+        url: str,
+        session: ClientSession,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        rate_limiter: Optional["RateLimiter"] = None,
+    ) -> "ConditionalResponse":
+        """
+        Fetches the raw body of a URL unless it is unchanged since a previous fetch.
+
+        The validators of the previous fetch are sent as `If-None-Match` and
+        `If-Modified-Since`; transient failures are retried like
+        `fetch_with_retries`.
+
+        Args:
+            url (str): The URL to fetch data from.
+            session (ClientSession): The shared aiohttp ClientSession.
+            etag (Optional[str]): ETag returned by the previous fetch.
+            last_modified (Optional[str]): Last-Modified returned by the previous fetch.
+            max_retries (int): Retries after the first attempt.
+            backoff (float): Delay before the first retry, doubled on each retry.
+            rate_limiter (Optional[RateLimiter]): Limiter awaited before every attempt.
+
+        Returns:
+            ConditionalResponse: The body and its validators, or `not_modified` on a 304.
+
+        Raises:
+            aiohttp.ClientError: If the last attempt fails.
+            asyncio.TimeoutError: If the last attempt times out.
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        async def attempt() -> ConditionalResponse:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    return ConditionalResponse(
+                        not_modified=True,
+                        etag=response.headers.get('ETag', etag),
+                        last_modified=response.headers.get('Last-Modified', last_modified),
+                    )
+                response.raise_for_status()
+                return ConditionalResponse(
+                    not_modified=False,
+                    body=await response.read(),
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'),
+                )
+
+        return await JSONFetcher._retry(url, attempt, max_retries, backoff, rate_limiter)
+
+    @staticmethod
+    async def fetch_with_retries(
+        url: str,
+        session: ClientSession,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        rate_limiter: Optional["RateLimiter"] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fetches JSON data, retrying transient failures with exponential backoff.
+
+        Connection errors, timeouts, 429 and 5xx responses are retried; other
+        HTTP errors are raised immediately.
+
+        Args:
+            url (str): The URL to fetch data from.
+            session (ClientSession): The shared aiohttp ClientSession.
+            max_retries (int): Retries after the first attempt.
+            backoff (float): Delay before the first retry, doubled on each retry.
+            rate_limiter (Optional[RateLimiter]): Limiter awaited before every attempt.
+
+        Returns:
+            Dict[str, Any]: The parsed JSON data.
+
+        Raises:
+            aiohttp.ClientError: If the last attempt fails.
+            asyncio.TimeoutError: If the last attempt times out.
+        """
+        return await JSONFetcher._retry(
+            url, lambda: JSONFetcher.fetch(url, session), max_retries, backoff, rate_limiter
+        )
+
+    @staticmethod
+    async def _retry(
+        url: str,
+        request: Callable[[], Awaitable[T]],
+        max_retries: int,
+        backoff: float,
+        rate_limiter: Optional["RateLimiter"],
+    ) -> T:
+        attempt = 0
+        while True:
+            if rate_limiter is not None:
+                await rate_limiter.wait()
+            try:
+                return await request()
+            except aiohttp.ClientResponseError as e:
+                if (e.status != 429 and e.status < 500) or attempt >= max_retries:
+                    raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt >= max_retries:
+                    raise
+            delay = backoff * 2 ** attempt
+            attempt += 1
+            logger.warning(f"Retrying {url} in {delay:.1f}s (attempt {attempt}/{max_retries})")
+            await asyncio.sleep(delay)
+
+@dataclass
+class ConditionalResponse:
+    """Result of a conditional request: the body and its validators, or a 304."""
+    not_modified: bool
+    body: bytes = b''
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+class RateLimiter:
+    """Spaces requests evenly so that at most `rate` start per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        """Waits until the next request slot is available."""
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class DigestCache:
+    """
+    Bounded LRU cache keyed on a content digest.
+
+    Keys are 16-byte BLAKE2b digests rather than the payloads themselves, so a
+    full cache holds at most `maxsize` small keys and values no matter how
+    large the cached documents were.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, Any]" = OrderedDict()
+
+    @staticmethod
+    def digest(data: Union[str, bytes]) -> bytes:
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: bytes, value: Any):
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+ProductData = Union[str, bytes, bytearray, Dict[str, Any]]
+
 class ProductAttributeExtractor:
     """Extracts and parses product attributes from JSON data."""
 
+    cache = DigestCache(int(os.getenv('CACHE_SIZE', '128')))
+
+    @staticmethod
+    def _load(data: ProductData) -> Dict[str, Any]:
+        if isinstance(data, (str, bytes, bytearray)):
+            return json.loads(data)
+        return data
+
+    @staticmethod
+    def _decode(raw: str) -> Dict[str, Any]:
+        try:
+            return json.loads(raw)
+        except (TypeError, json.JSONDecodeError) as e:
+            logger.error(f"Error extracting custom attributes: {e}")
+            raise ValueError("Custom attributes not found or invalid in JSON data")
+
     @staticmethod
-    @lru_cache(maxsize=None)
-    def extract(data: str) -> Dict[str, Any]:
+    def raw_custom_attributes(data: ProductData) -> str:
         """
-        Extracts custom attributes from the JSON data.
+        Returns the nested custom attributes JSON string without decoding it.
 
         Args:
-            data (str): JSON string containing product data.
+            data (ProductData): Product data as a parsed object, a JSON string or raw bytes.
 
         Returns:
-            Dict[str, Any]: Extracted custom attributes.
+            str: The `custom_attributes` value for the `es-CR` locale.
 
         Raises:
-            ValueError: If custom attributes are not found or are invalid.
+            ValueError: If custom attributes are not found or the data is not valid JSON.
         """
         try:
-            parsed_data = json.loads(data)
+            parsed_data = ProductAttributeExtractor._load(data)
             all_variants = parsed_data['allVariants']
             attributes_raw = next(attr for attr in all_variants[0]['attributesRaw'] if attr['name'] == 'custom_attributes')
-            return json.loads(attributes_raw['value']['es-CR'])
-        except (KeyError, StopIteration, json.JSONDecodeError) as e:
+            return attributes_raw['value']['es-CR']
+        except (KeyError, IndexError, TypeError, StopIteration, json.JSONDecodeError) as e:
             logger.error(f"Error extracting custom attributes: {e}")
             raise ValueError("Custom attributes not found or invalid in JSON data")
 
+    @staticmethod
+    def extract(data: ProductData) -> Dict[str, Any]:
+        """
+        Extracts custom attributes from the JSON data.
+
+        Args:
+            data (ProductData): Product data as a parsed object, a JSON string or raw
+                response bytes. Parsed objects are used as-is, without re-serializing.
+
+        Returns:
+            Dict[str, Any]: Extracted custom attributes.
+
+        Raises:
+            ValueError: If custom attributes are not found or are invalid.
+        """
+        raw = ProductAttributeExtractor.raw_custom_attributes(data)
+        return ProductAttributeExtractor._decode(raw)
+
+    @staticmethod
+    def extract_attributes(data: ProductData) -> ProductAttributes:
+        """
+        Extracts and parses product attributes in one step, memoizing the result.
+
+        Raw bytes and strings are keyed on a digest of the whole document, so a
+        repeated payload skips JSON decoding entirely. Parsed objects are keyed on
+        a digest of their nested custom attributes string.
+
+        Args:
+            data (ProductData): Product data as a parsed object, a JSON string or raw bytes.
+
+        Returns:
+            ProductAttributes: Parsed product attributes.
+
+        Raises:
+            ValueError: If custom attributes are not found or are invalid.
+            KeyError: If a required attribute is missing.
+        """
+        cache = ProductAttributeExtractor.cache
+        if isinstance(data, (str, bytes, bytearray)):
+            key = cache.digest(bytes(data) if isinstance(data, bytearray) else data)
+            attributes = cache.get(key)
+            if attributes is None:
+                custom_attributes = ProductAttributeExtractor.extract(data)
+                attributes = ProductAttributeExtractor.parse(custom_attributes)
+                cache.put(key, attributes)
+            return attributes
+
+        raw = ProductAttributeExtractor.raw_custom_attributes(data)
+        key = cache.digest(raw)
+        attributes = cache.get(key)
+        if attributes is None:
+            attributes = ProductAttributeExtractor.parse(ProductAttributeExtractor._decode(raw))
+            cache.put(key, attributes)
+        return attributes
+
     @staticmethod
     def parse(custom_attributes: Dict[str, Any]) -> ProductAttributes:
         """
@@ -137,27 +433,32 @@ class ProductAttributeExtractor:
         except ValueError as e:
             logger.error(f"Invalid value in custom attributes: {e}")
             raise
+        except InvalidOperation as e:
+            # Decimal signals a non-numeric quantity as an ArithmeticError
+            logger.error("Invalid quantity in custom attributes")
+            raise ValueError("Invalid quantity in custom attributes") from e
 
 class CSVWriter:
     """Handles writing product attributes to a CSV file."""
 
     @staticmethod
-    async def write(attributes: ProductAttributes, output_file: Path):
+    async def write(attributes: ProductAttributes, output_file: Path, source_url: str = ''):
         """
         Writes product attributes to a CSV file.
 
+        The file has the same columns as every other output (see `CSVStreamWriter`).
+
         Args:
             attributes (ProductAttributes): The product attributes to write.
             output_file (Path): The path to the output CSV file.
+            source_url (str): Value of the `source_url` column.
 
         Raises:
             IOError: If there's an error writing to the file.
         """
         try:
-            with output_file.open('w', newline='') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=asdict(attributes).keys())
-                writer.writeheader()
-                writer.writerow(asdict(attributes))
+            with CSVStreamWriter(output_file) as writer:
+                writer.write(source_url, attributes)
             logger.info(f"CSV file '{output_file}' has been created successfully.")
         except IOError as e:
             logger.error(f"Error writing to CSV file: {e}")
@@ -166,13 +467,22 @@ class CSVWriter:
 class ProductProcessor:
     """Coordinates the process of fetching, extracting, and writing product data."""
 
-    def __init__(self, json_url: str, output_file: Path):
+    def __init__(
+        self,
+        json_url: str,
+        output_file: Path,
+        output_format: Optional[str] = None,
+        row_group_size: int = 1 << 16,
+    ):
         self.json_url = json_url
         self.output_file = output_file
+        self.output_format = output_format
+        self.row_group_size = row_group_size
 
     async def process(self):
         """
-        Processes the product data: fetches JSON, extracts attributes, and writes to CSV.
+        Processes the product data: fetches JSON, extracts attributes, and writes one row
+        in the configured output format.
 
         Raises:
             Exception: If any error occurs during processing.
@@ -180,25 +490,575 @@ class ProductProcessor:
         try:
             async with aiohttp.ClientSession() as session:
                 json_data = await JSONFetcher.fetch(self.json_url, session)
-                custom_attributes = ProductAttributeExtractor.extract(json.dumps(json_data))
-                product_attributes = ProductAttributeExtractor.parse(custom_attributes)
-                await CSVWriter.write(product_attributes, self.output_file)
+                product_attributes = ProductAttributeExtractor.extract_attributes(json_data)
+            with open_output_writer(
+                self.output_file, self.output_format, self.row_group_size
+            ) as writer:
+                writer.write(self.json_url, product_attributes)
         except Exception as e:
             logger.error(f"An error occurred during processing: {e}")
             raise
 
-async def main():
-    """Main function to run the product attribute extraction process."""
-    json_url = os.getenv('JSON_URL', '')
-    output_file = Path(os.getenv('OUTPUT_FILE', 'output-product.csv'))
+@dataclass
+class BatchSummary:
+    """Counts of products processed by a batch run."""
+    succeeded: int = 0
+    failed: int = 0
+    unchanged: int = 0
+    resumed: int = 0
+
+class BatchProductProcessor:
+    """
+    Processes many product URLs concurrently into a single CSV file.
+
+    All requests share one ClientSession whose connector caps concurrent
+    connections. A fixed pool of workers pulls URLs from a queue, so memory
+    stays bounded regardless of how many URLs are given, and each result is
+    written as soon as it completes. Failed URLs produce an error row instead
+    of aborting the run.
+
+    With a `CheckpointIndex` the run is incremental: every URL is fetched with
+    the validators of its last export and only new or changed products are
+    written, and an interrupted run is resumed where its last commit left off.
+    """
+
+    def __init__(
+        self,
+        json_urls: Iterable[str],
+        output_file: Path,
+        max_connections: int = 20,
+        max_retries: int = 3,
+        rate_limit: float = 10.0,
+        output_format: Optional[str] = None,
+        row_group_size: int = 1 << 16,
+        checkpoint: Optional[CheckpointIndex] = None,
+        checkpoint_interval: int = 100,
+    ):
+        self.json_urls = json_urls
+        self.output_file = output_file
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.rate_limit = rate_limit
+        self.output_format = output_format
+        self.row_group_size = row_group_size
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+
+    async def process(self) -> BatchSummary:
+        """
+        Fetches, extracts and writes every product URL.
+
+        Returns:
+            BatchSummary: Number of products written, failed, unchanged since the
+            last run and already processed before an interruption.
+
+        Raises:
+            IOError: If the output file cannot be written.
+            ValueError: If a checkpointed run is asked for a non-CSV output.
+        """
+        summary = BatchSummary()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_connections * 2)
+        rate_limiter = RateLimiter(self.rate_limit)
+        connector = aiohttp.TCPConnector(limit=self.max_connections)
+        writer, run_id = self._open_writer()
+
+        async with aiohttp.ClientSession(connector=connector) as session:
+            with writer:
+                run, processed = self._start_run(writer, run_id)
+
+                async def worker():
+                    while True:
+                        url = await queue.get()
+                        try:
+                            await self._handle_url(url, session, rate_limiter, writer, summary, run)
+                        finally:
+                            queue.task_done()
+
+                workers = [asyncio.create_task(worker()) for _ in range(self.max_connections)]
+                feeder = asyncio.create_task(self._feed(queue, processed, summary))
+                try:
+                    # Workers only stop by raising, e.g. when the output cannot be written,
+                    # so that failure is raised instead of leaving the feeder blocked
+                    done, _ = await asyncio.wait(
+                        [feeder, *workers], return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        task.result()
+                finally:
+                    for task in [feeder, *workers]:
+                        task.cancel()
+                    await asyncio.gather(feeder, *workers, return_exceptions=True)
+                    if run is not None:
+                        run.commit()
+
+        if run is not None:
+            run.index.finish_run(run.run_id)
+        logger.info(
+            f"Batch finished: {summary.succeeded} products written, {summary.failed} failed, "
+            f"{summary.unchanged} unchanged, {summary.resumed} resumed ('{self.output_file}')"
+        )
+        return summary
+
+    async def _feed(self, queue: asyncio.Queue, processed: Set[str], summary: BatchSummary):
+        """Queues every URL not already committed, then waits until all are handled."""
+        for url in self.json_urls:
+            if url in processed:
+                summary.resumed += 1
+                continue
+            await queue.put(url)
+        await queue.join()
+
+    def _open_writer(self) -> Tuple[OutputWriter, Optional[int]]:
+        if self.checkpoint is None:
+            writer = open_output_writer(self.output_file, self.output_format, self.row_group_size)
+            return writer, None
+        if resolve_output_format(self.output_file, self.output_format) != 'csv':
+            raise ValueError("Checkpointed runs can only write CSV output")
+
+        run_id, resume_offset = self.checkpoint.begin_run(self.output_file)
+        if resume_offset is not None and (
+            not self.output_file.exists() or self.output_file.stat().st_size < resume_offset
+        ):
+            logger.warning(
+                f"Abandoning run {run_id}: '{self.output_file}' is missing or shorter than its "
+                f"last checkpoint ({resume_offset} bytes); starting a new run"
+            )
+            self.checkpoint.abandon_run(run_id)
+            run_id, resume_offset = self.checkpoint.begin_run(self.output_file)
+        if resume_offset is None:
+            return CSVStreamWriter(self.output_file, track_offsets=True), run_id
+
+        # Rows written after the last commit are dropped and their URLs processed again
+        os.truncate(self.output_file, resume_offset)
+        logger.info(f"Resuming run {run_id} of '{self.output_file}' at byte {resume_offset}")
+        return CSVStreamWriter(self.output_file, append=True, track_offsets=True), run_id
+
+    def _start_run(
+        self, writer: OutputWriter, run_id: Optional[int]
+    ) -> Tuple[Optional[CheckpointRun], Set[str]]:
+        """Returns the checkpoint run, if any, and the URLs it already committed."""
+        if self.checkpoint is None or run_id is None:
+            return None, set()
+        run = CheckpointRun(self.checkpoint, run_id, writer, self.checkpoint_interval)
+        return run, self.checkpoint.processed_urls(run_id)
+
+    async def _handle_url(
+        self,
+        url: str,
+        session: ClientSession,
+        rate_limiter: RateLimiter,
+        writer: OutputWriter,
+        summary: BatchSummary,
+        run: Optional[CheckpointRun],
+    ):
+        try:
+            if run is not None:
+                await self._process_incremental(url, session, rate_limiter, writer, summary, run)
+                return
+            attributes = await self._process_url(url, session, rate_limiter)
+            writer.write(url, attributes)
+            summary.succeeded += 1
+        except Exception as e:
+            logger.error(f"Failed to process {url}: {e}")
+            writer.write_error(url, str(e) or type(e).__name__)
+            summary.failed += 1
+
+    async def _process_url(
+        self, url: str, session: ClientSession, rate_limiter: RateLimiter
+    ) -> ProductAttributes:
+        json_data = await JSONFetcher.fetch_with_retries(
+            url, session, max_retries=self.max_retries, rate_limiter=rate_limiter
+        )
+        return ProductAttributeExtractor.extract_attributes(json_data)
+
+    async def _process_incremental(
+        self,
+        url: str,
+        session: ClientSession,
+        rate_limiter: RateLimiter,
+        writer: CSVStreamWriter,
+        summary: BatchSummary,
+        run: CheckpointRun,
+    ):
+        previous = run.index.get(url)
+        checkpoint = replace(previous or Checkpoint(url), run_id=run.run_id)
+        try:
+            response = await JSONFetcher.fetch_conditional(
+                url,
+                session,
+                etag=checkpoint.etag,
+                last_modified=checkpoint.last_modified,
+                max_retries=self.max_retries,
+                rate_limiter=rate_limiter,
+            )
+            checkpoint = replace(
+                checkpoint, etag=response.etag, last_modified=response.last_modified
+            )
+            # A server without validators still skips reprocessing when the body is identical
+            digest = None if response.not_modified else DigestCache.digest(response.body).hex()
+            if response.not_modified or digest == checkpoint.digest:
+                summary.unchanged += 1
+                run.record(checkpoint)
+                return
+            attributes = ProductAttributeExtractor.extract_attributes(response.body)
+        except Exception as e:
+            logger.error(f"Failed to process {url}: {e}")
+            # The previous validators are kept, so the URL is fetched again next run
+            failed = replace(
+                previous or Checkpoint(url),
+                run_id=run.run_id,
+                output_run_id=run.run_id,
+                output_offset=writer.offset,
+            )
+            writer.write_error(url, str(e) or type(e).__name__)
+            summary.failed += 1
+            run.record(failed)
+            return
+
+        exported = replace(
+            checkpoint, digest=digest, output_run_id=run.run_id, output_offset=writer.offset
+        )
+        writer.write(url, attributes)
+        summary.succeeded += 1
+        run.record(exported)
+
+class StreamingProductProcessor:
+    """
+    Converts a whole catalog export into CSV in constant memory.
+
+    The export (a URL or a local file) is read chunk by chunk; each product is
+    extracted, parsed and written as soon as it is complete, so at most one
+    chunk and one product are held in memory at a time. Products that fail to
+    parse produce an error row identified by `<source>#<index>`.
+
+    Downloads have no overall time limit, since large exports can take longer
+    than aiohttp's default 5 minutes; only connecting and each read are bounded.
+    """
+
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=60)
+
+    def __init__(
+        self,
+        source: str,
+        output_file: Path,
+        items_key: Optional[str] = None,
+        chunk_size: int = 1 << 16,
+        output_format: Optional[str] = None,
+        row_group_size: int = 1 << 16,
+    ):
+        self.source = source
+        self.output_file = output_file
+        self.items_key = items_key
+        self.chunk_size = chunk_size
+        self.output_format = output_format
+        self.row_group_size = row_group_size
+
+    async def process(self) -> BatchSummary:
+        """
+        Streams every product of the export into the output CSV.
+
+        Returns:
+            BatchSummary: Number of products written and failed.
+
+        Raises:
+            aiohttp.ClientError: If the export cannot be downloaded.
+            ValueError: If the export is not a complete JSON array.
+            IOError: If the input or output file cannot be accessed.
+        """
+        summary = BatchSummary()
+        parser = JSONArrayStreamParser(self.items_key)
+        writer = open_output_writer(self.output_file, self.output_format, self.row_group_size)
+        with writer:
+            if self.source.startswith(('http://', 'https://')):
+                async with aiohttp.ClientSession(timeout=self.timeout) as session:
+                    chunks = JSONFetcher.stream(self.source, session, self.chunk_size)
+                    index = 0
+                    async for product in aiter_products(chunks, parser):
+                        self._write_product(writer, summary, index, product)
+                        index += 1
+            else:
+                chunks = iter_file_chunks(Path(self.source), self.chunk_size)
+                for index, product in enumerate(iter_products(chunks, parser)):
+                    self._write_product(writer, summary, index, product)
+
+        logger.info(
+            f"Stream finished: {summary.succeeded} products written, {summary.failed} failed "
+            f"('{self.output_file}')"
+        )
+        return summary
+
+    def _write_product(
+        self, writer: OutputWriter, summary: BatchSummary, index: int, product: Any
+    ):
+        source_id = f"{self.source}#{index}"
+        try:
+            writer.write(source_id, ProductAttributeExtractor.extract_attributes(product))
+            summary.succeeded += 1
+        except (KeyError, ValueError, TypeError) as e:
+            logger.error(f"Failed to process {source_id}: {e}")
+            writer.write_error(source_id, str(e) or type(e).__name__)
+            summary.failed += 1
+
+def split_line_ranges(path: Path, shards: int) -> List[Tuple[int, int]]:
+    """
+    Splits a file into at most `shards` contiguous byte ranges of similar size.
+
+    Every range starts at the beginning of a line and ends just after a newline
+    (or at the end of the file), so no line is ever split between two ranges.
+
+    Args:
+        path (Path): The file to split.
+        shards (int): The maximum number of ranges.
+
+    Returns:
+        List[Tuple[int, int]]: `(start, end)` offsets, in file order.
+    """
+    size = path.stat().st_size
+    if size == 0:
+        return []
+
+    ranges = []
+    with path.open('rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        for shard in range(1, shards + 1):
+            if start >= size:
+                break
+            end = size * shard // shards
+            if end < size:
+                newline = mm.find(b'\n', max(end - 1, start))
+                end = size if newline == -1 else newline + 1
+            if end > start:
+                ranges.append((start, end))
+                start = end
+    return ranges
+
+def process_ndjson_range(
+    path: str,
+    start: int,
+    end: int,
+    part_file: str,
+    output_format: str = 'csv',
+    row_group_size: int = 1 << 16,
+) -> BatchSummary:
+    """
+    Extracts every product in a line-aligned byte range of an NDJSON file.
+
+    Runs in a worker process: the dump is memory-mapped, so only the pages of
+    this range are read, and the rows go to a part file (headerless for CSV).
+    Lines that fail to parse produce an error row identified by `<path>@<offset>`.
+
+    Args:
+        path (str): The NDJSON file.
+        start (int): Offset of the first byte of the range.
+        end (int): Offset just past the last byte of the range.
+        part_file (str): The file to write the rows of this range to.
+        output_format (str): `csv`, `parquet` or `arrow`.
+        row_group_size (int): Rows per Parquet row group or Arrow record batch.
+
+    Returns:
+        BatchSummary: Number of products written and failed in this range.
+    """
+    summary = BatchSummary()
+    if output_format == 'csv':
+        writer: OutputWriter = CSVStreamWriter(Path(part_file), header=False)
+    else:
+        writer = ColumnarWriter(Path(part_file), output_format, row_group_size=row_group_size)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            writer:
+        pos = start
+        while pos < end:
+            newline = mm.find(b'\n', pos, end)
+            line_end = end if newline == -1 else newline
+            line = mm[pos:line_end]
+            if line.strip():
+                source_id = f"{path}@{pos}"
+                try:
+                    writer.write(source_id, ProductAttributeExtractor.extract_attributes(line))
+                    summary.succeeded += 1
+                except (KeyError, ValueError, TypeError) as e:
+                    logger.error(f"Failed to process {source_id}: {e}")
+                    writer.write_error(source_id, str(e) or type(e).__name__)
+                    summary.failed += 1
+            pos = line_end + 1
+    return summary
+
+def merge_parts(
+    parts: Iterable[Path],
+    output_file: Path,
+    output_format: str = 'csv',
+    row_group_size: int = 1 << 16,
+):
+    """
+    Merges part files, in order, into a single output file.
+
+    CSV parts are headerless and concatenated under one header; the record
+    batches of Parquet and Arrow parts are streamed through one writer and
+    regrouped into `row_group_size` rows.
+    """
+    if output_format != 'csv':
+        batches = itertools.chain.from_iterable(
+            read_record_batches(part, output_format) for part in parts
+        )
+        with ColumnarWriter(output_file, output_format, row_group_size=row_group_size) as writer:
+            writer.write_batches(batches)
+        return
+
+    with output_file.open('w', newline='') as output:
+        csv.writer(output).writerow(CSVStreamWriter.fieldnames)
+        for part in parts:
+            with part.open(newline='') as part_file:
+                shutil.copyfileobj(part_file, output)
+
+class ShardedNDJSONProcessor:
+    """
+    Converts a local NDJSON dump (one product per line) on all cores.
 
-    processor = ProductProcessor(json_url, output_file)
-    
+    The dump is split into line-aligned byte ranges that are extracted in a
+    process pool, each range into its own part file. The parts are then merged
+    in range order, so the output rows keep the order of the dump. Several ranges
+    are made per worker so that a slow range does not leave the other cores
+    idle at the end of the run.
+    """
+
+    def __init__(
+        self,
+        source: Path,
+        output_file: Path,
+        workers: Optional[int] = None,
+        shards_per_worker: int = 4,
+        output_format: Optional[str] = None,
+        row_group_size: int = 1 << 16,
+    ):
+        self.source = source
+        self.output_file = output_file
+        self.workers = workers or os.cpu_count() or 1
+        self.shards_per_worker = shards_per_worker
+        self.output_format = resolve_output_format(output_file, output_format)
+        self.row_group_size = row_group_size
+
+    async def process(self) -> BatchSummary:
+        """
+        Extracts every product of the dump into the output file.
+
+        Returns:
+            BatchSummary: Number of products written and failed.
+
+        Raises:
+            IOError: If the dump or the output file cannot be accessed.
+        """
+        summary = BatchSummary()
+        ranges = split_line_ranges(self.source, self.workers * self.shards_per_worker)
+        loop = asyncio.get_running_loop()
+
+        # Parts are written next to the output so the merge never crosses filesystems
+        with tempfile.TemporaryDirectory(
+            prefix='.parts-', dir=self.output_file.parent
+        ) as parts_dir:
+            parts = [
+                Path(parts_dir) / f"part-{i:05d}.{self.output_format}" for i in range(len(ranges))
+            ]
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = await asyncio.gather(*(
+                    loop.run_in_executor(
+                        pool, process_ndjson_range, str(self.source), start, end, str(part),
+                        self.output_format, self.row_group_size,
+                    )
+                    for (start, end), part in zip(ranges, parts)
+                ))
+            for result in results:
+                summary.succeeded += result.succeeded
+                summary.failed += result.failed
+            merge_parts(parts, self.output_file, self.output_format, self.row_group_size)
+
+        logger.info(
+            f"Sharded run finished on {self.workers} workers: {summary.succeeded} products "
+            f"written, {summary.failed} failed ('{self.output_file}')"
+        )
+        return summary
+
+def read_urls(urls_file: Optional[str], urls: Optional[str]) -> Iterable[str]:
+    """Yields product URLs from a file (one per line) or a comma-separated string."""
+    if urls_file:
+        with open(urls_file) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    yield line
+    elif urls:
+        for url in urls.split(','):
+            if url.strip():
+                yield url.strip()
+
+async def run_or_exit(processor: Any, description: str):
+    """Runs a processor, logging the failure and exiting with status 1 if it raises."""
     try:
         await processor.process()
     except Exception as e:
-        logger.error(f"Processing failed: {e}")
+        logger.error(f"{description} failed: {e}")
         exit(1)
 
+def output_options() -> Dict[str, Any]:
+    """Output settings shared by every mode."""
+    return {
+        'output_format': os.getenv('OUTPUT_FORMAT') or None,
+        'row_group_size': int(os.getenv('ROW_GROUP_SIZE', str(1 << 16))),
+    }
+
+async def run_sharded(ndjson_source: str, output_file: Path):
+    processor = ShardedNDJSONProcessor(
+        Path(ndjson_source),
+        output_file,
+        workers=int(os.getenv('WORKERS', '0')) or None,
+        **output_options(),
+    )
+    await run_or_exit(processor, "Sharded processing")
+
+async def run_stream(stream_source: str, output_file: Path):
+    processor = StreamingProductProcessor(
+        stream_source,
+        output_file,
+        items_key=os.getenv('STREAM_ITEMS_KEY') or None,
+        chunk_size=int(os.getenv('STREAM_CHUNK_SIZE', str(1 << 16))),
+        **output_options(),
+    )
+    await run_or_exit(processor, "Stream processing")
+
+async def run_batch(urls_file: Optional[str], urls: Optional[str], output_file: Path):
+    checkpoint_db = os.getenv('CHECKPOINT_DB')
+    checkpoint = CheckpointIndex(Path(checkpoint_db)) if checkpoint_db else None
+    processor = BatchProductProcessor(
+        read_urls(urls_file, urls),
+        output_file,
+        max_connections=int(os.getenv('MAX_CONNECTIONS', '20')),
+        max_retries=int(os.getenv('MAX_RETRIES', '3')),
+        rate_limit=float(os.getenv('RATE_LIMIT', '10')),
+        checkpoint=checkpoint,
+        checkpoint_interval=int(os.getenv('CHECKPOINT_INTERVAL', '100')),
+        **output_options(),
+    )
+    try:
+        await run_or_exit(processor, "Batch processing")
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+async def main():
+    """Main function to run the product attribute extraction process."""
+    output_file = Path(os.getenv('OUTPUT_FILE', 'output-product.csv'))
+    urls_file = os.getenv('JSON_URLS_FILE')
+    urls = os.getenv('JSON_URLS')
+    stream_source = os.getenv('STREAM_SOURCE')
+    ndjson_source = os.getenv('NDJSON_SOURCE')
+
+    if ndjson_source:
+        await run_sharded(ndjson_source, output_file)
+    elif stream_source:
+        await run_stream(stream_source, output_file)
+    elif urls_file or urls:
+        await run_batch(urls_file, urls, output_file)
+    else:
+        processor = ProductProcessor(os.getenv('JSON_URL', ''), output_file, **output_options())
+        await run_or_exit(processor, "Processing")
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""
+Product data model shared by the extractor and the output writers.
+"""
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import List
+
+@dataclass(frozen=True)
+class ProductAttributes:
+    """Represents the attributes of a product."""
+    allergens: List[str] = field(default_factory=list)
+    sku: str = ""
+    vegan: bool = False
+    kosher: bool = False
+    organic: bool = False
+    vegetarian: bool = False
+    gluten_free: bool = False
+    lactose_free: bool = False
+    package_quantity: Decimal = Decimal('0')
+    unit_size: Decimal = Decimal('0')
+    net_weight: Decimal = Decimal('0')
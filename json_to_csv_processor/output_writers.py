@@ -0,0 +1,352 @@
+"""
+Output layer: writers turning product rows into CSV, Parquet or Arrow files.
+
+Every writer produces the columns `source_url`, every `ProductAttributes`
+field and `error`. `open_output_writer` picks the writer for an output file.
+"""
+
+import csv
+import operator
+import os
+from abc import ABC, abstractmethod
+from dataclasses import fields
+from decimal import Decimal, ROUND_HALF_EVEN
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, TextIO
+
+from models import ProductAttributes
+
+try:
+    import pyarrow as pa # type: ignore
+    import pyarrow.parquet as pq # type: ignore
+except ImportError:  # pyarrow is only needed for Parquet and Arrow output
+    pa = pq = None
+
+ATTRIBUTE_NAMES = [f.name for f in fields(ProductAttributes)]
+# Reads every attribute of a ProductAttributes, in field order, as one tuple
+_attribute_values = operator.attrgetter(*ATTRIBUTE_NAMES)
+
+class OutputWriter(ABC):
+    """
+    Base class of the formats product rows can be written in.
+
+    A writer is a context manager that receives one call per product, either
+    `write` with its attributes or `write_error`, and keeps the rows in call
+    order. Every row records the source of the product and, for failed
+    products, the error message instead of the attribute values.
+    """
+
+    fieldnames = ['source_url'] + ATTRIBUTE_NAMES + ['error']
+
+    def __init__(self, output_file: Path):
+        self.output_file = output_file
+
+    def __enter__(self) -> "OutputWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @abstractmethod
+    def write(self, source_url: str, attributes: ProductAttributes):
+        """Writes a row for a successfully parsed product."""
+
+    @abstractmethod
+    def write_error(self, source_url: str, error: str):
+        """Writes a row recording why a product could not be processed."""
+
+    def close(self):
+        """Flushes buffered rows and closes the file."""
+
+class _ByteCounter:
+    """Forwards writes to a text file while counting the UTF-8 bytes written."""
+
+    def __init__(self, file: TextIO, offset: int):
+        self.file = file
+        self.offset = offset
+
+    def write(self, text: str) -> int:
+        self.offset += len(text.encode('utf-8'))
+        return self.file.write(text)
+
+class CSVStreamWriter(OutputWriter):
+    """
+    Streams product rows into a CSV file through a large write buffer.
+
+    Rows are built as plain tuples straight from the attributes. With `append`,
+    rows are added to an existing file and the header is only written if the
+    file is empty, so a file can be extended across runs. With `track_offsets`,
+    `offset` gives the byte offset at which the next row starts without
+    flushing the buffer.
+    """
+
+    def __init__(
+        self,
+        output_file: Path,
+        header: bool = True,
+        append: bool = False,
+        buffer_size: int = 1 << 20,
+        track_offsets: bool = False,
+    ):
+        super().__init__(output_file)
+        self.header = header
+        self.append = append
+        self.buffer_size = buffer_size
+        self.track_offsets = track_offsets
+        self._file: Optional[TextIO] = None
+        self._counter: Optional[_ByteCounter] = None
+        self._writer: Any = None
+        self._empty_attributes = ('',) * len(ATTRIBUTE_NAMES)
+
+    def __enter__(self) -> "CSVStreamWriter":
+        self._file = self.output_file.open(
+            'a' if self.append else 'w', newline='', encoding='utf-8',
+            buffering=self.buffer_size,
+        )
+        if self.track_offsets:
+            self._counter = _ByteCounter(self._file, self._file.buffer.tell())
+            self._writer = csv.writer(self._counter)
+        else:
+            self._writer = csv.writer(self._file)
+        if self.header and self._file.tell() == 0:
+            self._writer.writerow(self.fieldnames)
+        return self
+
+    @property
+    def offset(self) -> int:
+        """Byte offset at which the next row will start (requires `track_offsets`)."""
+        if self._counter is None:
+            raise ValueError("CSVStreamWriter was opened without track_offsets")
+        return self._counter.offset
+
+    def write(self, source_url: str, attributes: ProductAttributes):
+        self._writer.writerow((source_url, *_attribute_values(attributes), ''))
+
+    def write_error(self, source_url: str, error: str):
+        self._writer.writerow((source_url, *self._empty_attributes, error))
+
+    def sync(self) -> int:
+        """Flushes the rows written so far to disk and returns the file size in bytes."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.buffer.tell()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def arrow_schema(quantity_precision: int = 18, quantity_scale: int = 6) -> "pa.Schema":
+    """
+    Returns the Arrow schema of product rows.
+
+    Allergens are a list of strings, flags are booleans and quantities are
+    decimals, so typed consumers read them without re-parsing text.
+    """
+    quantity = pa.decimal128(quantity_precision, quantity_scale)
+    types = {
+        'allergens': pa.list_(pa.string()),
+        'sku': pa.string(),
+        'package_quantity': quantity,
+        'unit_size': quantity,
+        'net_weight': quantity,
+    }
+    return pa.schema(
+        [pa.field('source_url', pa.string())]
+        + [pa.field(name, types.get(name, pa.bool_())) for name in ATTRIBUTE_NAMES]
+        + [pa.field('error', pa.string())]
+    )
+
+class ColumnarWriter(OutputWriter):
+    """
+    Writes product rows as Parquet or as an Arrow IPC file.
+
+    Rows are accumulated in one Python list per column and converted into a
+    typed record batch every `row_group_size` rows, which becomes one Parquet
+    row group (or one Arrow record batch). Columns of failed products are null.
+    Quantities are rounded to the scale of the decimal column.
+
+    `write` checks every value against the schema before buffering the row and
+    raises ValueError for a product that does not fit, so callers record it
+    with `write_error` instead of the whole row group failing on flush.
+    """
+
+    FORMATS = ('parquet', 'arrow')
+
+    def __init__(
+        self,
+        output_file: Path,
+        output_format: str = 'parquet',
+        row_group_size: int = 1 << 16,
+        compression: str = 'snappy',
+    ):
+        if pa is None:
+            raise ImportError("pyarrow is required for Parquet and Arrow output")
+        if output_format not in self.FORMATS:
+            raise ValueError(f"Unsupported columnar format: {output_format}")
+        super().__init__(output_file)
+        self.output_format = output_format
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.schema = arrow_schema()
+        quantity_type = self.schema.field('net_weight').type
+        self._quantum = Decimal(1).scaleb(-quantity_type.scale)
+        self._quantity_limit = Decimal(10) ** (quantity_type.precision - quantity_type.scale)
+        self._quantity_indexes = [
+            ATTRIBUTE_NAMES.index(name) for name in ('package_quantity', 'unit_size', 'net_weight')
+        ]
+        self._bool_indexes = [
+            index for index, name in enumerate(ATTRIBUTE_NAMES)
+            if self.schema.field(name).type == pa.bool_()
+        ]
+        self._columns: List[List[Any]] = [[] for _ in self.fieldnames]
+        self._attribute_columns = self._columns[1:-1]
+        self._writer: Any = None
+
+    def __enter__(self) -> "ColumnarWriter":
+        if self.output_format == 'parquet':
+            self._writer = pq.ParquetWriter(
+                str(self.output_file), self.schema, compression=self.compression
+            )
+        else:
+            self._writer = pa.ipc.new_file(str(self.output_file), self.schema)
+        return self
+
+    def write(self, source_url: str, attributes: ProductAttributes):
+        """
+        Buffers a row for a successfully parsed product.
+
+        Raises:
+            ValueError: If an attribute does not fit its column type.
+        """
+        values = self._typed_values(attributes)
+        for column, value in zip(self._attribute_columns, values):
+            column.append(value)
+        columns = self._columns
+        columns[0].append(source_url)
+        columns[-1].append(None)
+        if len(columns[0]) >= self.row_group_size:
+            self.flush()
+
+    def write_error(self, source_url: str, error: str):
+        for column in self._attribute_columns:
+            column.append(None)
+        columns = self._columns
+        columns[0].append(source_url)
+        columns[-1].append(error)
+        if len(columns[0]) >= self.row_group_size:
+            self.flush()
+
+    def write_batches(self, batches: Iterable["pa.RecordBatch"]):
+        """
+        Writes already-built record batches after the rows buffered so far.
+
+        The batches are regrouped into `row_group_size` rows, so their own sizes
+        (and the boundaries between the files they came from) don't leak into
+        the output's row groups.
+        """
+        self.flush()
+        pending: List["pa.RecordBatch"] = []
+        pending_rows = 0
+        for batch in batches:
+            pending.append(batch)
+            pending_rows += len(batch)
+            while pending_rows >= self.row_group_size:
+                table = pa.Table.from_batches(pending, schema=self.schema)
+                self._write_table(table.slice(0, self.row_group_size))
+                rest = table.slice(self.row_group_size)
+                pending, pending_rows = rest.to_batches(), len(rest)
+        if pending_rows:
+            self._write_table(pa.Table.from_batches(pending, schema=self.schema))
+
+    def flush(self):
+        """Converts the buffered rows into a record batch and writes it."""
+        if not self._columns[0]:
+            return
+        arrays = [
+            pa.array(column, type=column_field.type)
+            for column, column_field in zip(self._columns, self.schema)
+        ]
+        for column in self._columns:
+            column.clear()
+        self._write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def _typed_values(self, attributes: ProductAttributes) -> List[Any]:
+        values = list(_attribute_values(attributes))
+        for index in self._bool_indexes:
+            if not isinstance(values[index], bool):
+                raise ValueError(f"{ATTRIBUTE_NAMES[index]} is not a boolean: {values[index]!r}")
+        for index in self._quantity_indexes:
+            value = values[index]
+            if not isinstance(value, Decimal) or not value.is_finite():
+                raise ValueError(f"{ATTRIBUTE_NAMES[index]} is not a decimal: {value!r}")
+            if abs(value) < self._quantity_limit:
+                value = value.quantize(self._quantum, rounding=ROUND_HALF_EVEN)
+            # Checked again after rounding, which can carry into one more digit
+            if abs(value) >= self._quantity_limit:
+                raise ValueError(
+                    f"{ATTRIBUTE_NAMES[index]} is out of range for the decimal column: "
+                    f"{values[index]}"
+                )
+            values[index] = value
+        allergens = values[ATTRIBUTE_NAMES.index('allergens')]
+        if not isinstance(allergens, list) or not all(isinstance(a, str) for a in allergens):
+            raise ValueError(f"allergens is not a list of strings: {allergens!r}")
+        sku = values[ATTRIBUTE_NAMES.index('sku')]
+        if not isinstance(sku, str):
+            raise ValueError(f"sku is not a string: {sku!r}")
+        return values
+
+    def _write_table(self, table: "pa.Table"):
+        if self.output_format == 'parquet':
+            self._writer.write_table(table, row_group_size=len(table))
+        else:
+            self._writer.write_table(table.combine_chunks())
+
+    def close(self):
+        if self._writer is not None:
+            self.flush()
+            self._writer.close()
+            self._writer = None
+
+def read_record_batches(path: Path, output_format: str) -> Iterator["pa.RecordBatch"]:
+    """Yields the record batches of a file written by `ColumnarWriter`, one at a time."""
+    if output_format == 'parquet':
+        yield from pq.ParquetFile(str(path)).iter_batches()
+    else:
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+
+OUTPUT_SUFFIXES = {'.csv': 'csv', '.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow'}
+
+def resolve_output_format(output_file: Path, output_format: Optional[str] = None) -> str:
+    """Returns the explicit output format, or the one implied by the file extension."""
+    if output_format:
+        return output_format.lower()
+    return OUTPUT_SUFFIXES.get(output_file.suffix.lower(), 'csv')
+
+def open_output_writer(
+    output_file: Path, output_format: Optional[str] = None, row_group_size: int = 1 << 16
+) -> OutputWriter:
+    """
+    Creates the writer for an output file.
+
+    Args:
+        output_file (Path): The file to write.
+        output_format (Optional[str]): `csv`, `parquet` or `arrow`; inferred from the
+            file extension when omitted.
+        row_group_size (int): Rows per Parquet row group or Arrow record batch.
+
+    Returns:
+        OutputWriter: A writer to use as a context manager.
+
+    Raises:
+        ValueError: If the format is not supported.
+        ImportError: If a columnar format is requested and pyarrow is not installed.
+    """
+    output_format = resolve_output_format(output_file, output_format)
+    if output_format == 'csv':
+        return CSVStreamWriter(output_file)
+    return ColumnarWriter(output_file, output_format, row_group_size=row_group_size)
@@ -0,0 +1,206 @@
+"""
+Incremental parsing of large JSON catalog exports.
+
+`JSONArrayStreamParser` decodes the elements of a JSON array from arbitrary
+chunks of bytes; `iter_products` and `aiter_products` drive it from files and
+streamed responses.
+"""
+
+import codecs
+import json
+import re
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Optional
+
+class JSONArrayStreamParser:
+    """
+    Incrementally decodes the elements of a JSON array.
+
+    Bytes are fed in arbitrary chunks and every complete element is returned,
+    already decoded, as soon as it has fully arrived, so memory is bounded by
+    the largest single element rather than the whole document. The array is
+    either the top-level value or, with `items_key`, the value of that key in
+    the top-level object (e.g. `{"results": [...]}`).
+
+    The document prefix is scanned for structural characters only until the
+    array opens; from then on each element is decoded by the C
+    `JSONDecoder.raw_decode`, so the bulk of the input never goes through a
+    Python-level loop.
+    """
+
+    _STRUCTURAL = re.compile(r'[\[\]{}"]')
+    # Body of a string up to (not including) its closing quote; escapes are consumed whole
+    _STRING_BODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+    _SEPARATORS = re.compile(r'[\s,]*')
+    _NUMBER_CHARS = re.compile(r'[-+.eE0-9]*')
+
+    def __init__(self, items_key: Optional[str] = None, max_element_size: int = 64 << 20):
+        self.items_key = items_key
+        self.max_element_size = max_element_size
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._retry_at = 0
+        self._depth = 0
+        self._in_string = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._in_items = False
+        self.finished = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """
+        Consumes a chunk of input.
+
+        Args:
+            chunk (bytes): The next bytes of the document.
+
+        Returns:
+            List[Any]: Every element completed by this chunk, decoded.
+
+        Raises:
+            ValueError: If the document is malformed or an element exceeds
+                `max_element_size` characters.
+        """
+        if self.finished:
+            return []
+        self._buffer += self._utf8.decode(chunk)
+        if not self._in_items:
+            self._find_items()
+        elements: List[Any] = []
+        if self._in_items:
+            self._decode_elements(elements)
+        return elements
+
+    def close(self) -> List[Any]:
+        """
+        Decodes whatever is still buffered and checks that the whole array was read.
+
+        Returns:
+            List[Any]: Elements that were complete but not yet returned by `feed`.
+
+        Raises:
+            ValueError: If the input ended before the array was closed.
+        """
+        elements: List[Any] = []
+        self._buffer += self._utf8.decode(b'', final=True)
+        if self._in_items and not self.finished:
+            self._retry_at = 0
+            self._decode_elements(elements)
+        if not self.finished:
+            raise ValueError("JSON stream ended before the product array was complete")
+        return elements
+
+    def _decode_elements(self, elements: List[Any]):
+        buf, i = self._buffer, self._pos
+        while True:
+            i = self._SEPARATORS.match(buf, i).end()
+            if i >= len(buf):
+                break
+            if buf[i] == ']':
+                self.finished = True
+                i += 1
+                break
+            if len(buf) < self._retry_at:
+                break
+            try:
+                element, end = self._decoder.raw_decode(buf, i)
+            except json.JSONDecodeError as e:
+                if len(buf) - i > self.max_element_size:
+                    raise ValueError(f"Invalid or oversized element in JSON stream: {e}")
+                # Incomplete element: retry once the pending part has doubled, so a
+                # large element is re-decoded a logarithmic number of times
+                self._retry_at = len(buf) + max(len(buf) - i, 1)
+                break
+            if not isinstance(element, (dict, list)) and not self._scalar_complete(buf, i, end):
+                break
+            elements.append(element)
+            self._retry_at = 0
+            i = end
+        self._buffer = buf[i:]
+        self._pos = 0
+        self._retry_at = max(self._retry_at - i, 0)
+
+    def _scalar_complete(self, buf: str, start: int, end: int) -> bool:
+        # raw_decode stops at the longest valid prefix, so a number cut at "2." or
+        # "1e" decodes early; it is only complete once something else follows it
+        tail = self._NUMBER_CHARS.match(buf, end).end()
+        if tail == len(buf):
+            return False
+        if tail != end:
+            raise ValueError(f"Invalid number in JSON stream: {buf[start:tail + 1]!r}")
+        return True
+
+    def _find_items(self):
+        buf, i = self._buffer, self._pos
+        while True:
+            if self._in_string:
+                end = self._STRING_BODY.match(buf, i).end()
+                if end >= len(buf) or buf[end] != '"':
+                    i = end
+                    break
+                self._in_string = False
+                if self._depth == 1:
+                    self._last_string = buf[self._string_start:end]
+                i = end + 1
+                continue
+
+            match = self._STRUCTURAL.search(buf, i)
+            if match is None:
+                i = len(buf)
+                break
+            char = match.group()
+            i = match.end()
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in '[{':
+                if char == '[' and self._is_items_array():
+                    self._in_items = True
+                    break
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth <= 0:
+                    raise ValueError("JSON stream does not contain the product array")
+
+        # Drop the scanned prefix, keeping an unfinished string that may be the items key
+        keep_from = self._string_start if self._in_string else i
+        self._buffer = buf[keep_from:]
+        self._pos = i - keep_from
+        self._string_start = 0
+
+    def _is_items_array(self) -> bool:
+        if self.items_key is None:
+            return self._depth == 0
+        return self._depth == 1 and self._last_string == self.items_key
+
+def iter_file_chunks(path: Path, chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    """Yields a file's contents in chunks of at most `chunk_size` bytes."""
+    with path.open('rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+def iter_products(chunks: Iterable[bytes], parser: JSONArrayStreamParser) -> Iterator[Any]:
+    """Yields each product, decoded, as soon as it is complete in `chunks`."""
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.finished:
+            break
+    yield from parser.close()
+
+async def aiter_products(
+    chunks: AsyncIterator[bytes], parser: JSONArrayStreamParser
+) -> AsyncIterator[Any]:
+    """Asynchronous counterpart of `iter_products` for streamed responses."""
+    async for chunk in chunks:
+        for element in parser.feed(chunk):
+            yield element
+        if parser.finished:
+            break
+    for element in parser.close():
+        yield element
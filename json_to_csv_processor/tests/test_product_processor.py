@@ -1,11 +1,20 @@
 import pytest
+import asyncio
+import csv
 import json
-from pathlib import Path
 from unittest.mock import patch, MagicMock, AsyncMock
 from decimal import Decimal
 import aiohttp
 
-from main import ProductProcessor, ProductAttributes, JSONFetcher, ProductAttributeExtractor, CSVWriter
+from checkpoints import CheckpointIndex
+from main import (
+    ProductProcessor, JSONFetcher, ProductAttributeExtractor, CSVWriter, BatchProductProcessor,
+    read_urls, DigestCache, StreamingProductProcessor, split_line_ranges, ShardedNDJSONProcessor,
+    ConditionalResponse,
+)
+from models import ProductAttributes
+from output_writers import CSVStreamWriter, ColumnarWriter, open_output_writer
+from stream_parser import JSONArrayStreamParser, iter_products
 
 @pytest.fixture
 def sample_json_data():
@@ -33,11 +42,11 @@ def sample_json_data():
     }
 
 @pytest.mark.asyncio
-async def test_product_processor(sample_json_data):
+async def test_product_processor(sample_json_data, tmp_path):
     with patch.object(JSONFetcher, 'fetch', return_value=sample_json_data), \
-         patch.object(CSVWriter, 'write') as mock_write:
+         patch.object(CSVStreamWriter, 'write') as mock_write:
         
-        processor = ProductProcessor("http://api.example.com", Path("output.csv"))
+        processor = ProductProcessor("http://api.example.com", tmp_path / "output.csv")
         await processor.process()
 
         expected_attributes = ProductAttributes(
@@ -55,9 +64,21 @@ async def test_product_processor(sample_json_data):
         )
 
         mock_write.assert_called_once()
-        actual_attributes, actual_path = mock_write.call_args[0]
+        actual_url, actual_attributes = mock_write.call_args[0]
+        assert actual_url == "http://api.example.com"
         assert actual_attributes == expected_attributes
-        assert actual_path == Path("output.csv")
+
+@pytest.mark.asyncio
+async def test_product_processor_uses_output_format(sample_json_data, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    output_file = tmp_path / "product.parquet"
+    with patch.object(JSONFetcher, 'fetch', return_value=sample_json_data):
+        await ProductProcessor("http://api.example.com", output_file).process()
+
+    rows = pq.read_table(str(output_file)).to_pylist()
+    assert [(row["source_url"], row["sku"]) for row in rows] == [
+        ("http://api.example.com", "12345")
+    ]
 
 def test_product_attribute_extractor():
     sample_data = {
@@ -139,4 +160,491 @@ async def test_csv_writer_error(tmp_path):
     invalid_path = tmp_path / "non_existent_directory" / "test_output.csv"
     
     with pytest.raises(OSError):
-        await CSVWriter.write(attributes, invalid_path)
\ No newline at end of file
+        await CSVWriter.write(attributes, invalid_path)
+
+@pytest.mark.asyncio
+async def test_batch_processor_writes_rows_and_errors(sample_json_data, tmp_path):
+    async def fake_fetch(url, session):
+        if url.endswith("missing"):
+            raise aiohttp.ClientResponseError(MagicMock(), (), status=404, message="Not Found")
+        if url.endswith("invalid"):
+            return {"invalid": "data"}
+        return sample_json_data
+
+    output_file = tmp_path / "batch.csv"
+    urls = [f"http://api.example.com/{i}" for i in range(5)] + [
+        "http://api.example.com/missing",
+        "http://api.example.com/invalid",
+    ]
+    with patch.object(JSONFetcher, 'fetch', side_effect=fake_fetch):
+        summary = await BatchProductProcessor(
+            urls, output_file, max_connections=3, rate_limit=0
+        ).process()
+
+    assert summary.succeeded == 5
+    assert summary.failed == 2
+    with output_file.open() as f:
+        rows = {row['source_url']: row for row in csv.DictReader(f)}
+    assert set(rows) == set(urls)
+    assert rows["http://api.example.com/0"]['sku'] == "12345"
+    assert rows["http://api.example.com/0"]['error'] == ""
+    assert "Not Found" in rows["http://api.example.com/missing"]['error']
+    assert rows["http://api.example.com/invalid"]['error'] != ""
+
+@pytest.mark.asyncio
+async def test_batch_processor_raises_when_output_cannot_be_written(tmp_path):
+    urls = [f"http://api.example.com/{i}" for i in range(50)]
+    fetch = AsyncMock(return_value={"invalid": "data"})
+    write_error = MagicMock(side_effect=OSError("No space left on device"))
+
+    with patch.object(JSONFetcher, 'fetch', fetch), \
+         patch.object(CSVStreamWriter, 'write_error', write_error):
+        with pytest.raises(OSError, match="No space left"):
+            await asyncio.wait_for(
+                BatchProductProcessor(
+                    urls, tmp_path / "batch.csv", max_connections=3, rate_limit=0
+                ).process(),
+                timeout=5,
+            )
+
+@pytest.mark.asyncio
+async def test_fetch_with_retries_retries_transient_errors(sample_json_data):
+    fetch = AsyncMock(side_effect=[
+        aiohttp.ClientResponseError(MagicMock(), (), status=503),
+        aiohttp.ClientConnectionError(),
+        sample_json_data,
+    ])
+    with patch.object(JSONFetcher, 'fetch', fetch):
+        result = await JSONFetcher.fetch_with_retries(
+            "http://api.example.com", MagicMock(), backoff=0
+        )
+
+    assert result == sample_json_data
+    assert fetch.call_count == 3
+
+@pytest.mark.asyncio
+async def test_fetch_with_retries_does_not_retry_client_errors():
+    fetch = AsyncMock(side_effect=aiohttp.ClientResponseError(MagicMock(), (), status=404))
+    with patch.object(JSONFetcher, 'fetch', fetch):
+        with pytest.raises(aiohttp.ClientResponseError):
+            await JSONFetcher.fetch_with_retries("http://api.example.com", MagicMock(), backoff=0)
+
+    assert fetch.call_count == 1
+
+def test_read_urls(tmp_path):
+    urls_file = tmp_path / "urls.txt"
+    urls_file.write_text("http://a.example.com\n\n# comment\nhttp://b.example.com\n")
+
+    assert list(read_urls(str(urls_file), None)) == ["http://a.example.com", "http://b.example.com"]
+    assert list(read_urls(None, "http://a.example.com, http://b.example.com")) == [
+        "http://a.example.com", "http://b.example.com"
+    ]
+
+def test_extract_accepts_parsed_objects_and_bytes(sample_json_data):
+    from_dict = ProductAttributeExtractor.extract(sample_json_data)
+    from_bytes = ProductAttributeExtractor.extract(json.dumps(sample_json_data).encode())
+
+    assert from_dict == from_bytes
+    assert from_dict['sku']['value'] == "12345"
+
+def test_extract_attributes_memoizes_by_digest(sample_json_data):
+    parse = ProductAttributeExtractor.parse
+    with patch.object(ProductAttributeExtractor, 'cache', DigestCache(maxsize=2)), \
+         patch.object(ProductAttributeExtractor, 'parse', wraps=parse) as mock_parse:
+        body = json.dumps(sample_json_data).encode()
+        first = ProductAttributeExtractor.extract_attributes(body)
+        second = ProductAttributeExtractor.extract_attributes(body)
+        from_dict = ProductAttributeExtractor.extract_attributes(sample_json_data)
+
+        assert first == second == from_dict
+        assert mock_parse.call_count == 2
+        assert len(ProductAttributeExtractor.cache) == 2
+
+def test_digest_cache_is_bounded():
+    cache = DigestCache(maxsize=2)
+    keys = [cache.digest(str(i)) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, i)
+
+    assert len(cache) == 2
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == 2
+
+def test_digest_cache_disabled():
+    cache = DigestCache(maxsize=0)
+    cache.put(cache.digest("a"), 1)
+
+    assert len(cache) == 0
+
+def split_chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 4096])
+def test_stream_parser_splits_array_elements(chunk_size):
+    items = [
+        {"name": "a [tricky] {string}", "nested": [[1, 2], {"x": "\\\""}]},
+        {"name": "b \u00fc \u20ac", "empty": {}},
+        [1, 2, 3],
+        12345,
+    ]
+    data = json.dumps(items, ensure_ascii=False).encode()
+
+    elements = list(iter_products(split_chunks(data, chunk_size), JSONArrayStreamParser()))
+
+    assert elements == items
+
+def test_stream_parser_numbers_split_at_every_position():
+    data = b'[1, -2.5e-3, 3.25, 40E+1, true, "x", 6]'
+
+    for split in range(1, len(data)):
+        chunks = [data[:split], data[split:]]
+        elements = list(iter_products(chunks, JSONArrayStreamParser()))
+
+        assert elements == [1, -2.5e-3, 3.25, 400.0, True, "x", 6], split
+
+def test_stream_parser_rejects_malformed_number():
+    with pytest.raises(ValueError):
+        list(iter_products([b'[1, 2.x]'], JSONArrayStreamParser()))
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 4096])
+def test_stream_parser_items_key(chunk_size):
+    document = {
+        "count": 2, "label": "results", "results": [{"id": 1}, {"id": 2}], "after": [{"id": 3}]
+    }
+    data = json.dumps(document).encode()
+
+    elements = list(iter_products(split_chunks(data, chunk_size), JSONArrayStreamParser("results")))
+
+    assert elements == [{"id": 1}, {"id": 2}]
+
+def test_stream_parser_rejects_truncated_input():
+    data = json.dumps([{"id": 1}, {"id": 2}]).encode()[:-5]
+
+    with pytest.raises(ValueError):
+        list(iter_products([data], JSONArrayStreamParser()))
+
+def test_stream_parser_rejects_oversized_element():
+    parser = JSONArrayStreamParser(max_element_size=100)
+
+    with pytest.raises(ValueError):
+        parser.feed(b'[{"id": 1}, {"id": ' + b" " * 200)
+
+def test_stream_parser_buffer_is_bounded():
+    parser = JSONArrayStreamParser()
+    product = json.dumps({"padding": "x" * 1000}).encode()
+    parser.feed(b"[")
+    for _ in range(1000):
+        parser.feed(product + b",")
+
+    assert len(parser._buffer) < 2 * len(product)
+
+@pytest.mark.asyncio
+async def test_streaming_processor_from_file(sample_json_data, tmp_path):
+    export = tmp_path / "catalog.json"
+    products = [sample_json_data, {"invalid": "data"}, sample_json_data]
+    export.write_text(json.dumps({"products": products}))
+    output_file = tmp_path / "catalog.csv"
+
+    summary = await StreamingProductProcessor(
+        str(export), output_file, items_key="products", chunk_size=50
+    ).process()
+
+    assert summary.succeeded == 2
+    assert summary.failed == 1
+    with output_file.open() as f:
+        rows = list(csv.DictReader(f))
+    assert [row['sku'] for row in rows] == ["12345", "", "12345"]
+    assert rows[1]['source_url'] == f"{export}#1"
+    assert rows[1]['error'] != ""
+
+@pytest.mark.asyncio
+async def test_streaming_processor_writes_error_row_for_bad_quantity(sample_json_data, tmp_path):
+    bad = json.loads(json.dumps(sample_json_data))
+    custom = json.loads(bad["allVariants"][0]["attributesRaw"][0]["value"]["es-CR"])
+    custom["unit_size"]["value"] = "abc"
+    bad["allVariants"][0]["attributesRaw"][0]["value"]["es-CR"] = json.dumps(custom)
+    export = tmp_path / "catalog.json"
+    export.write_text(json.dumps([sample_json_data, bad, sample_json_data]))
+    output_file = tmp_path / "catalog.csv"
+
+    summary = await StreamingProductProcessor(str(export), output_file).process()
+
+    assert (summary.succeeded, summary.failed) == (2, 1)
+    with output_file.open() as f:
+        rows = list(csv.DictReader(f))
+    assert rows[1]['error'] == "Invalid quantity in custom attributes"
+
+@pytest.mark.parametrize("shards", [1, 2, 3, 7, 50])
+def test_split_line_ranges_covers_whole_lines(tmp_path, shards):
+    dump = tmp_path / "dump.ndjson"
+    dump.write_bytes(b"".join(b'{"id": %d}\n' % i for i in range(20)) + b'{"id": 20}')
+
+    ranges = split_line_ranges(dump, shards)
+
+    data = dump.read_bytes()
+    assert 1 <= len(ranges) <= shards
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+    assert all(data[end - 1:end] == b"\n" for _, end in ranges[:-1])
+
+def test_split_line_ranges_empty_file(tmp_path):
+    dump = tmp_path / "dump.ndjson"
+    dump.write_bytes(b"")
+
+    assert split_line_ranges(dump, 4) == []
+
+@pytest.mark.asyncio
+async def test_sharded_processor_keeps_dump_order(sample_json_data, tmp_path):
+    products = []
+    for i in range(30):
+        product = json.loads(json.dumps(sample_json_data))
+        custom = json.loads(product["allVariants"][0]["attributesRaw"][0]["value"]["es-CR"])
+        custom["sku"]["value"] = str(i)
+        product["allVariants"][0]["attributesRaw"][0]["value"]["es-CR"] = json.dumps(custom)
+        products.append(json.dumps(product))
+    products[10] = '{"invalid": "data"}'
+    dump = tmp_path / "dump.ndjson"
+    dump.write_text("\n".join(products[:20]) + "\n\n" + "\n".join(products[20:]) + "\n")
+    output_file = tmp_path / "products.csv"
+
+    summary = await ShardedNDJSONProcessor(dump, output_file, workers=2).process()
+
+    assert summary.succeeded == 29
+    assert summary.failed == 1
+    with output_file.open() as f:
+        rows = list(csv.DictReader(f))
+    assert [row['sku'] for row in rows] == [str(i) if i != 10 else "" for i in range(30)]
+    assert rows[10]['error'] != ""
+    assert rows[10]['source_url'].startswith(f"{dump}@")
+    assert set(tmp_path.iterdir()) == {dump, output_file}
+
+@pytest.mark.asyncio
+async def test_sharded_processor_writes_error_row_for_bad_quantity(sample_json_data, tmp_path):
+    bad = json.loads(json.dumps(sample_json_data))
+    custom = json.loads(bad["allVariants"][0]["attributesRaw"][0]["value"]["es-CR"])
+    custom["package_quantity"]["value"] = "many"
+    bad["allVariants"][0]["attributesRaw"][0]["value"]["es-CR"] = json.dumps(custom)
+    dump = tmp_path / "dump.ndjson"
+    dump.write_text("\n".join(json.dumps(p) for p in [sample_json_data, bad, sample_json_data]))
+    output_file = tmp_path / "products.csv"
+
+    summary = await ShardedNDJSONProcessor(dump, output_file, workers=1).process()
+
+    assert (summary.succeeded, summary.failed) == (2, 1)
+    with output_file.open() as f:
+        rows = list(csv.DictReader(f))
+    assert [row['sku'] for row in rows] == ["12345", "", "12345"]
+    assert rows[1]['error'] == "Invalid quantity in custom attributes"
+
+def test_csv_stream_writer_appends_without_repeating_header(tmp_path):
+    output_file = tmp_path / "products.csv"
+    attributes = ProductAttributes(
+        allergens=["Milk"], sku="1", vegan=True, net_weight=Decimal("2.5")
+    )
+
+    with CSVStreamWriter(output_file) as writer:
+        writer.write("a", attributes)
+    with CSVStreamWriter(output_file, append=True) as writer:
+        writer.write_error("b", "boom")
+
+    with output_file.open() as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2
+    assert rows[0]['allergens'] == "['Milk']"
+    assert rows[0]['vegan'] == "True"
+    assert rows[0]['net_weight'] == "2.5"
+    assert rows[1]['sku'] == "" and rows[1]['error'] == "boom"
+
+@pytest.mark.parametrize("output_format", ["parquet", "arrow"])
+def test_columnar_writer_keeps_types(tmp_path, output_format):
+    pa = pytest.importorskip("pyarrow")
+    output_file = tmp_path / f"products.{output_format}"
+    attributes = ProductAttributes(
+        allergens=["Milk", "Soy"], sku="1", kosher=True, package_quantity=Decimal("2"),
+        unit_size=Decimal("0.1234567"), net_weight=Decimal("500"),
+    )
+
+    with open_output_writer(output_file, row_group_size=2) as writer:
+        assert isinstance(writer, ColumnarWriter)
+        for i in range(4):
+            writer.write(f"url-{i}", attributes)
+        writer.write_error("url-4", "boom")
+
+    if output_format == "parquet":
+        import pyarrow.parquet as pq
+        assert pq.ParquetFile(str(output_file)).num_row_groups == 3
+        table = pq.read_table(str(output_file))
+    else:
+        table = pa.ipc.open_file(str(output_file)).read_all()
+    rows = table.to_pylist()
+    assert table.schema.field("allergens").type == pa.list_(pa.string())
+    assert pa.types.is_decimal(table.schema.field("net_weight").type)
+    assert [row["source_url"] for row in rows] == [f"url-{i}" for i in range(5)]
+    assert rows[0]["allergens"] == ["Milk", "Soy"]
+    assert rows[0]["kosher"] is True
+    assert rows[0]["net_weight"] == Decimal("500")
+    assert rows[0]["unit_size"] == Decimal("0.123457")
+    assert rows[0]["error"] is None
+    assert rows[4]["sku"] is None and rows[4]["error"] == "boom"
+
+@pytest.mark.asyncio
+async def test_sharded_processor_parquet_output(sample_json_data, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    dump = tmp_path / "dump.ndjson"
+    dump.write_text("\n".join([json.dumps(sample_json_data)] * 10 + ['{"invalid": "data"}']) + "\n")
+    output_file = tmp_path / "products.parquet"
+
+    summary = await ShardedNDJSONProcessor(dump, output_file, workers=2, row_group_size=3).process()
+
+    assert summary.succeeded == 10
+    assert summary.failed == 1
+    rows = pq.read_table(str(output_file)).to_pylist()
+    assert [row["sku"] for row in rows] == ["12345"] * 10 + [None]
+    assert rows[0]["allergens"] == ["Milk"]
+    metadata = pq.ParquetFile(str(output_file)).metadata
+    # Parts are regrouped, so only the last row group is partial
+    assert [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)] == [3, 3, 3, 2]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("custom_values", [{"vegan": "yes"}, {"net_weight": "1e20"}])
+async def test_columnar_output_writes_error_row_for_untyped_product(
+    sample_json_data, tmp_path, custom_values
+):
+    pq = pytest.importorskip("pyarrow.parquet")
+    bad = json.loads(json.dumps(sample_json_data))
+    custom = json.loads(bad["allVariants"][0]["attributesRaw"][0]["value"]["es-CR"])
+    for name, value in custom_values.items():
+        custom[name]["value"] = value
+    bad["allVariants"][0]["attributesRaw"][0]["value"]["es-CR"] = json.dumps(custom)
+    export = tmp_path / "catalog.json"
+    export.write_text(json.dumps([sample_json_data, bad, sample_json_data]))
+    output_file = tmp_path / "catalog.parquet"
+
+    summary = await StreamingProductProcessor(str(export), output_file).process()
+
+    assert (summary.succeeded, summary.failed) == (2, 1)
+    rows = pq.read_table(str(output_file)).to_pylist()
+    assert [row["sku"] for row in rows] == ["12345", None, "12345"]
+    assert rows[1]["error"]
+
+def product_body(data, sku):
+    product = json.loads(json.dumps(data))
+    custom = json.loads(product["allVariants"][0]["attributesRaw"][0]["value"]["es-CR"])
+    custom["sku"]["value"] = sku
+    product["allVariants"][0]["attributesRaw"][0]["value"]["es-CR"] = json.dumps(custom)
+    return json.dumps(product).encode()
+
+def conditional_server(bodies):
+    calls = []
+
+    async def fetch_conditional(url, session, etag=None, last_modified=None, **kwargs):
+        calls.append((url, etag))
+        await asyncio.sleep(0)
+        current = f'"{DigestCache.digest(bodies[url]).hex()}"'
+        if etag == current:
+            return ConditionalResponse(not_modified=True, etag=etag)
+        return ConditionalResponse(not_modified=False, body=bodies[url], etag=current)
+
+    return fetch_conditional, calls
+
+def read_skus(output_file):
+    with output_file.open() as f:
+        return [(row['source_url'], row['sku']) for row in csv.DictReader(f)]
+
+@pytest.mark.asyncio
+async def test_checkpointed_batch_only_exports_changed_products(sample_json_data, tmp_path):
+    urls = [f"http://api.example.com/{i}" for i in range(3)]
+    bodies = {url: product_body(sample_json_data, str(i)) for i, url in enumerate(urls)}
+    fetch_conditional, calls = conditional_server(bodies)
+    index = CheckpointIndex(tmp_path / "checkpoints.db")
+    output_file = tmp_path / "products.csv"
+
+    with patch.object(JSONFetcher, 'fetch_conditional', fetch_conditional):
+        first = await BatchProductProcessor(
+            urls, output_file, rate_limit=0, checkpoint=index
+        ).process()
+        bodies[urls[1]] = product_body(sample_json_data, "changed")
+        second = await BatchProductProcessor(
+            urls, output_file, rate_limit=0, checkpoint=index
+        ).process()
+
+    assert (first.succeeded, first.unchanged) == (3, 0)
+    assert (second.succeeded, second.unchanged) == (1, 2)
+    assert read_skus(output_file) == [(urls[1], "changed")]
+    assert all(etag is not None for _, etag in calls[3:])
+    checkpoint = index.get(urls[1])
+    assert checkpoint.digest is not None
+    assert checkpoint.output_run_id == checkpoint.run_id
+    # The offset points at the start of the URL's row
+    with output_file.open('rb') as f:
+        f.seek(checkpoint.output_offset)
+        assert f.readline().startswith(urls[1].encode())
+
+@pytest.mark.asyncio
+async def test_checkpointed_batch_resumes_interrupted_run(sample_json_data, tmp_path):
+    urls = [f"http://api.example.com/{i}" for i in range(10)]
+    bodies = {url: product_body(sample_json_data, str(i)) for i, url in enumerate(urls)}
+    fetch_conditional, calls = conditional_server(bodies)
+    index = CheckpointIndex(tmp_path / "checkpoints.db")
+    output_file = tmp_path / "products.csv"
+
+    def interrupted_urls():
+        yield from urls[:6]
+        raise RuntimeError("interrupted")
+
+    with patch.object(JSONFetcher, 'fetch_conditional', fetch_conditional):
+        with pytest.raises(RuntimeError):
+            await BatchProductProcessor(
+                interrupted_urls(), output_file, max_connections=1, rate_limit=0,
+                checkpoint=index, checkpoint_interval=2,
+            ).process()
+        first_run_calls = len(calls)
+        # A row written after the last commit is dropped on resume
+        with output_file.open('a') as f:
+            f.write("http://api.example.com/partial,")
+        summary = await BatchProductProcessor(
+            urls, output_file, max_connections=2, rate_limit=0, checkpoint=index,
+        ).process()
+
+    assert summary.resumed + summary.succeeded == 10
+    assert summary.resumed > 0
+    # URLs committed before the interruption are not fetched again
+    assert len(calls) - first_run_calls == summary.succeeded
+    assert sorted(read_skus(output_file)) == sorted((url, str(i)) for i, url in enumerate(urls))
+
+@pytest.mark.asyncio
+async def test_checkpointed_batch_abandons_run_with_missing_output(sample_json_data, tmp_path):
+    urls = [f"http://api.example.com/{i}" for i in range(10)]
+    bodies = {url: product_body(sample_json_data, str(i)) for i, url in enumerate(urls)}
+    fetch_conditional, _ = conditional_server(bodies)
+    index = CheckpointIndex(tmp_path / "checkpoints.db")
+    output_file = tmp_path / "products.csv"
+
+    def interrupted_urls():
+        yield from urls[:6]
+        raise RuntimeError("interrupted")
+
+    with patch.object(JSONFetcher, 'fetch_conditional', fetch_conditional):
+        with pytest.raises(RuntimeError):
+            await BatchProductProcessor(
+                interrupted_urls(), output_file, max_connections=1, rate_limit=0,
+                checkpoint=index, checkpoint_interval=2,
+            ).process()
+        output_file.unlink()
+        summary = await BatchProductProcessor(
+            urls, output_file, rate_limit=0, checkpoint=index
+        ).process()
+        again = await BatchProductProcessor(
+            urls, output_file, rate_limit=0, checkpoint=index
+        ).process()
+
+    # Products whose rows were lost with the output are exported again
+    assert (summary.succeeded, summary.resumed) == (10, 0)
+    assert (again.succeeded, again.unchanged) == (0, 10)
+
+@pytest.mark.asyncio
+async def test_checkpointed_batch_requires_csv_output(tmp_path):
+    index = CheckpointIndex(tmp_path / "checkpoints.db")
+
+    with pytest.raises(ValueError):
+        await BatchProductProcessor([], tmp_path / "products.parquet", checkpoint=index).process()
@@ -0,0 +1,114 @@
+"""
+Startup-time benchmark for the scraper API.
+
+Measures, in fresh interpreters:
+  * the time to import ``src.main`` (what uvicorn pays before binding the port)
+  * the lifespan warm-up, per component and in total, run in parallel
+  * the same components warmed up one after another, for comparison
+  * the app lifespan: how long until it serves requests, with warm-up in the background
+
+Components that cannot start here (no Redis, no Chromium, ...) are reported as
+failed rather than aborting the run.
+
+Usage:
+    PYTHONPATH=. python benchmarks/startup_benchmark.py [--runs N]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import src.main
+print(time.perf_counter() - start)
+"""
+
+WARM_UP_SNIPPET = """
+import asyncio, json, time
+import logging
+logging.disable(logging.CRITICAL)
+from src.services import lifecycle
+
+async def sequential():
+    durations = {}
+    components = {
+        "redis": lifecycle.init_redis,
+        "http_session": lifecycle.start_http_session,
+        "browser": lifecycle.start_browser,
+        "parser": lifecycle.import_parser,
+        "mongodb": lifecycle.start_persistence,
+    }
+    for name, factory in components.items():
+        durations[name] = await lifecycle._warm(name, factory())
+    return durations
+
+async def run(mode):
+    start = time.perf_counter()
+    durations = await (lifecycle.warm_up() if mode == "parallel" else sequential())
+    total = time.perf_counter() - start
+    ready = dict(lifecycle.readiness)
+    await lifecycle.shut_down()
+    print(json.dumps({"total": total, "components": durations, "ready": ready}))
+
+asyncio.run(run("%s"))
+"""
+
+LIFESPAN_SNIPPET = """
+import asyncio, json, time
+import logging
+logging.disable(logging.CRITICAL)
+from src.main import app, lifespan
+from src.services import lifecycle
+
+async def run():
+    start = time.perf_counter()
+    async with lifespan(app):
+        serving = time.perf_counter() - start
+        while lifecycle.warming_up():
+            await asyncio.sleep(0.001)
+        warm = time.perf_counter() - start
+    print(json.dumps({"serving": serving, "warm": warm}))
+
+asyncio.run(run())
+"""
+
+
+def run_snippet(snippet: str) -> str:
+    completed = subprocess.run(
+        [sys.executable, "-c", snippet], capture_output=True, text=True, check=True
+    )
+    return completed.stdout.strip().splitlines()[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    import_times = [float(run_snippet(IMPORT_SNIPPET)) for _ in range(args.runs)]
+    print(f"import src.main        median {statistics.median(import_times):.3f}s "
+          f"(min {min(import_times):.3f}s, max {max(import_times):.3f}s, runs={args.runs})")
+
+    for mode in ("sequential", "parallel"):
+        results = [json.loads(run_snippet(WARM_UP_SNIPPET % mode)) for _ in range(args.runs)]
+        totals = [r["total"] for r in results]
+        print(f"warm-up ({mode:<10})  median {statistics.median(totals):.3f}s "
+              f"(min {min(totals):.3f}s, max {max(totals):.3f}s)")
+        for name in results[0]["components"]:
+            component_times = [r["components"][name] for r in results]
+            state = "ok" if results[-1]["ready"].get(name) else "failed"
+            print(f"    {name:<14} median {statistics.median(component_times):.3f}s  [{state}]")
+
+    results = [json.loads(run_snippet(LIFESPAN_SNIPPET)) for _ in range(args.runs)]
+    for key, label in (("serving", "lifespan serving"), ("warm", "lifespan warm")):
+        times = [r[key] for r in results]
+        print(f"{label:<22} median {statistics.median(times):.3f}s "
+              f"(min {min(times):.3f}s, max {max(times):.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
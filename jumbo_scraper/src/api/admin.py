@@ -0,0 +1,41 @@
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from starlette.status import HTTP_409_CONFLICT
+from ..core.config import settings
+from ..core.security import get_admin_api_key
+from ..services.profiling import profile_event_loop, task_dump
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+# Only one capture at a time: overlapping profiles would skew each other
+_capture_in_progress = False
+
+@asynccontextmanager
+async def _exclusive_capture():
+    global _capture_in_progress
+    if _capture_in_progress:
+        raise HTTPException(status_code=HTTP_409_CONFLICT, detail="A profile capture is already running")
+    _capture_in_progress = True
+    try:
+        yield
+    finally:
+        _capture_in_progress = False
+
+@router.post("/profile/cpu", response_class=PlainTextResponse)
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0, le=settings.PROFILE_MAX_SECONDS),
+    api_key: str = Depends(get_admin_api_key),
+):
+    """Samples the worker's event loop for N seconds; returns collapsed stacks for flamegraphs."""
+    async with _exclusive_capture():
+        return await profile_event_loop(seconds)
+
+@router.post("/profile/tasks")
+async def profile_tasks(
+    seconds: float = Query(5.0, gt=0, le=settings.PROFILE_MAX_SECONDS),
+    api_key: str = Depends(get_admin_api_key),
+):
+    """Measures event-loop lag for N seconds, then dumps every pending asyncio task."""
+    async with _exclusive_capture():
+        return await task_dump(seconds)
\ No newline at end of file
@@ -1,56 +1,206 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Dict, Any
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import JSONResponse, Response
+from starlette.status import HTTP_304_NOT_MODIFIED, HTTP_503_SERVICE_UNAVAILABLE
+from typing import List, Dict, Any, Optional
 from ..core.security import get_api_key
 from ..models.product import ScrapeRequest, MultiScrapeRequest
-from ..services.scraper import scrape_products
-from ..utils.redis_helper import get_cached_result, set_cached_result
+from ..services.scraper import scrape_products, browser_ready, http_session_ready
+from ..utils.redis_helper import (
+    CacheMetadata, get_redis_client, get_cached_metadata, get_cached_body, get_cached_bodies,
+    set_cached_encoding, get_cached_list_body, set_cached_list_body, cache_result_body,
+    encode_result, compute_etag,
+)
+from ..utils.http_cache import IDENTITY, negotiate_encoding, compress, representation_etag, combine_etags, match_etag
 from ..core.config import settings
+from ..services.persistence import persist_result, persistence_status
+from ..services.lifecycle import scrape_tracker, readiness, warming_up
+from ..services.tracing import traced
 from ..services.prometheus_metrics import SCRAPE_REQUESTS_TOTAL, SUCCESSFUL_SCRAPES_TOTAL, SCRAPE_ERRORS_TOTAL
 
 router = APIRouter()
 
+def ensure_accepting_scrapes():
+    if scrape_tracker.draining:
+        raise HTTPException(status_code=HTTP_503_SERVICE_UNAVAILABLE, detail="Server is shutting down")
+
+JSON_MEDIA_TYPE = "application/json"
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Vary": "Accept-Encoding"})
+
+def json_response(body: bytes, etag: str, encoding: str) -> Response:
+    headers = {"ETag": representation_etag(etag, encoding), "Vary": "Accept-Encoding"}
+    if encoding != IDENTITY:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+@traced("endpoint.encode_response")
+async def encoded_result_response(url: str, body: bytes, etag: str, accept_encoding: Optional[str]) -> Response:
+    encoding = negotiate_encoding(accept_encoding, len(body), settings.COMPRESSION_MIN_SIZE)
+    if encoding != IDENTITY:
+        body = await asyncio.to_thread(compress, body, encoding)
+        await set_cached_encoding(url, encoding, body)
+    return json_response(body, etag, encoding)
+
+async def cached_result_response(url: str, metadata: CacheMetadata, accept_encoding: Optional[str]) -> Optional[Response]:
+    # Serves a precompressed copy when one exists; otherwise compresses once and stores it
+    encoding = negotiate_encoding(accept_encoding, metadata.size, settings.COMPRESSION_MIN_SIZE)
+    body = await get_cached_body(url, encoding)
+    if body is not None:
+        return json_response(body, metadata.etag, encoding)
+    if encoding == IDENTITY:
+        return None
+    identity_body = await get_cached_body(url)
+    if identity_body is None:
+        return None
+    return await encoded_result_response(url, identity_body, metadata.etag, accept_encoding)
+
 @router.post("/scrape", response_model=Dict[str, Any], tags=["scraping"])
-async def scrape(request: ScrapeRequest, api_key: str = Depends(get_api_key)):
+async def scrape(
+    request: ScrapeRequest,
+    api_key: str = Depends(get_api_key),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    ensure_accepting_scrapes()
+    async with scrape_tracker.track():
+        return await _scrape(request, if_none_match, accept_encoding)
+
+@traced("endpoint.scrape")
+async def _scrape(request: ScrapeRequest, if_none_match: Optional[str], accept_encoding: Optional[str]):
     try:
         url = str(request.url)
         SCRAPE_REQUESTS_TOTAL.inc()
-        
-        cached_result = await get_cached_result(url)
-        if cached_result:
-            return cached_result
-        
+
+        [metadata] = await get_cached_metadata([url])
+        if metadata:
+            matched_etag = match_etag(if_none_match, metadata.etag)
+            if matched_etag:
+                return not_modified(matched_etag)
+            response = await cached_result_response(url, metadata, accept_encoding)
+            if response is not None:
+                return response
+
         result = await scrape_products(url, timeout=settings.SCRAPE_TIMEOUT)
-        
+        body = encode_result(result)
+
         if 'error' not in result:
             SUCCESSFUL_SCRAPES_TOTAL.inc()
-            await set_cached_result(url, result)
+            etag = await cache_result_body(url, body)
+            persist_result(result)
         else:
             SCRAPE_ERRORS_TOTAL.inc()
-        
-        return result
+            etag = compute_etag(body)
+
+        matched_etag = match_etag(if_none_match, etag)
+        if matched_etag:
+            return not_modified(matched_etag)
+        if 'error' not in result:
+            return await encoded_result_response(url, body, etag, accept_encoding)
+        return json_response(body, etag, IDENTITY)
     except Exception as e:
         SCRAPE_ERRORS_TOTAL.inc()
         raise HTTPException(status_code=500, detail=f"Error during scraping: {str(e)}")
 
 @router.post("/scrape_multiple", response_model=List[Dict[str, Any]], tags=["scraping"])
-async def scrape_multiple(request: MultiScrapeRequest, api_key: str = Depends(get_api_key)):
+async def scrape_multiple(
+    request: MultiScrapeRequest,
+    api_key: str = Depends(get_api_key),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    ensure_accepting_scrapes()
+    async with scrape_tracker.track():
+        return await _scrape_multiple(request, if_none_match, accept_encoding)
+
+@traced("endpoint.scrape_multiple")
+async def _scrape_multiple(request: MultiScrapeRequest, if_none_match: Optional[str], accept_encoding: Optional[str]):
     try:
-        results = []
-        for url in request.urls:
-            SCRAPE_REQUESTS_TOTAL.inc()
-            cached_result = await get_cached_result(str(url))
-            if cached_result:
-                results.append(cached_result)
+        urls = [str(url) for url in request.urls]
+        SCRAPE_REQUESTS_TOTAL.inc(len(urls))
+        metadata = await get_cached_metadata(urls)
+
+        # When every result is cached, the list ETag and size are known from metadata
+        # alone, so a 304 or a precompressed list can be served without reading any item
+        if all(metadata):
+            list_etag = combine_etags([m.etag for m in metadata])
+            matched_etag = match_etag(if_none_match, list_etag)
+            if matched_etag:
+                return not_modified(matched_etag)
+            list_size = sum(m.size for m in metadata) + len(metadata) + 1
+            encoding = negotiate_encoding(accept_encoding, list_size, settings.COMPRESSION_MIN_SIZE)
+            if encoding != IDENTITY:
+                compressed_body = await get_cached_list_body(list_etag, encoding)
+                if compressed_body is not None:
+                    return json_response(compressed_body, list_etag, encoding)
+
+        cached_bodies = await get_cached_bodies([url for url, m in zip(urls, metadata) if m])
+        cached_bodies = iter(cached_bodies)
+        bodies = []
+        etags = []
+        for url, meta in zip(urls, metadata):
+            body = next(cached_bodies) if meta else None
+            if body is not None:
+                etag = meta.etag
             else:
-                result = await scrape_products(str(url), timeout=settings.SCRAPE_TIMEOUT)
-                results.append(result)
+                result = await scrape_products(url, timeout=settings.SCRAPE_TIMEOUT)
+                body = encode_result(result)
                 if 'error' not in result:
                     SUCCESSFUL_SCRAPES_TOTAL.inc()
-                    await set_cached_result(result["url"], result)
+                    etag = await cache_result_body(result["url"], body)
+                    persist_result(result)
                 else:
                     SCRAPE_ERRORS_TOTAL.inc()
-        
-        return results
+                    etag = compute_etag(body)
+            bodies.append(body)
+            etags.append(etag)
+
+        # Cached items are already JSON, so the list is assembled without re-serializing them
+        list_body = b"[" + b",".join(bodies) + b"]"
+        list_etag = combine_etags(etags)
+        matched_etag = match_etag(if_none_match, list_etag)
+        if matched_etag:
+            return not_modified(matched_etag)
+
+        encoding = negotiate_encoding(accept_encoding, len(list_body), settings.COMPRESSION_MIN_SIZE)
+        if encoding != IDENTITY:
+            compressed_body = await get_cached_list_body(list_etag, encoding)
+            if compressed_body is None:
+                compressed_body = await asyncio.to_thread(compress, list_body, encoding)
+                await set_cached_list_body(list_etag, encoding, compressed_body)
+            list_body = compressed_body
+        return json_response(list_body, list_etag, encoding)
     except Exception as e:
         SCRAPE_ERRORS_TOTAL.inc()
-        raise HTTPException(status_code=500, detail=f"Error during multiple scraping: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error during multiple scraping: {str(e)}")
+
+@router.get("/health", tags=["health"])
+async def health():
+    try:
+        await get_redis_client().ping()
+        redis_status = "connected"
+    except Exception:
+        redis_status = "disconnected"
+
+    # Persistence is best effort, so MongoDB is reported but never fails the check
+    mongodb_status = await persistence_status()
+    status = {
+        "redis": redis_status,
+        "mongodb": mongodb_status,
+        "browser": "ready" if browser_ready() else "not ready",
+        "http_session": "ready" if http_session_ready() else "not ready",
+        "in_flight_scrapes": scrape_tracker.in_flight,
+    }
+
+    if scrape_tracker.draining:
+        status["status"] = "draining"
+    elif warming_up() or not readiness:
+        status["status"] = "starting"
+    elif redis_status == "connected" and browser_ready():
+        status["status"] = "healthy"
+    else:
+        status["status"] = "unhealthy"
+
+    status_code = 200 if status["status"] == "healthy" else HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=status_code, content=status)
\ No newline at end of file
@@ -1,4 +1,4 @@
 from .config import settings
-from .security import get_api_key
+from .security import get_api_key, get_admin_api_key
 
-__all__ = ["settings", "get_api_key"]
\ No newline at end of file
+__all__ = ["settings", "get_api_key", "get_admin_api_key"]
\ No newline at end of file
@@ -15,15 +15,43 @@ class Settings(BaseSettings):
     REDIS_RETRY_ON_TIMEOUT: bool = Field(default=True)
     REDIS_CACHE_EXPIRATION: int = Field(default=300)  # 5 minutes
 
+    # Responses smaller than this (bytes) are never compressed
+    COMPRESSION_MIN_SIZE: int = Field(default=1024)
+
+    # MongoDB configuration (persistence is disabled when MONGODB_URL is empty)
+    MONGODB_URL: str = Field(default="")
+    MONGODB_MAX_POOL_SIZE: int = Field(default=100)
+    MONGODB_MIN_POOL_SIZE: int = Field(default=0)
+    MONGODB_MAX_IDLE_TIME_MS: int = Field(default=10000)
+    MONGODB_PING_TIMEOUT: float = Field(default=1.0)
+
+    # Persistence settings
+    PERSISTENCE_BATCH_SIZE: int = Field(default=100)
+    PERSISTENCE_FLUSH_INTERVAL: float = Field(default=2.0)
+    PERSISTENCE_MAX_QUEUE_SIZE: int = Field(default=1000)
+    # Must fit between SHUTDOWN_DRAIN_TIMEOUT and fly.toml's kill_timeout
+    PERSISTENCE_STOP_TIMEOUT: float = Field(default=4.0)
+
     # API Key configuration
     API_KEY: str = Field(...)
     API_KEY_NAME: str = Field(default="X-API-Key")
+    ADMIN_API_KEY: str = Field(default="")  # admin endpoints are disabled when empty
 
     # Scraping settings
     SCRAPE_TIMEOUT: int = Field(default=30000)
     RATE_LIMIT_CALLS: int = Field(default=1)
     RATE_LIMIT_PERIOD: float = Field(default=1.0)
 
+    # Lifecycle settings
+    STARTUP_TIMEOUT: float = Field(default=60.0)
+    # Uvicorn's graceful-shutdown timeout when started through DrainingServer
+    SHUTDOWN_DRAIN_TIMEOUT: float = Field(default=25.0)
+
+    # Tracing and profiling settings
+    TRACING_ENABLED: bool = Field(default=False)
+    TRACING_EXPORT_FILE: str = Field(default="traces.jsonl")
+    PROFILE_MAX_SECONDS: float = Field(default=60.0)
+
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
@@ -39,4 +67,9 @@ class Settings(BaseSettings):
         else:
             return f"redis://{host}:{port}/0"
 
+    @property
+    def mongodb_database(self):
+        parsed_url = urlparse(self.MONGODB_URL)
+        return parsed_url.path.lstrip('/') or 'default_db'
+
 settings = Settings()
\ No newline at end of file
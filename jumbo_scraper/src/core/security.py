@@ -8,6 +8,15 @@ api_key_header = APIKeyHeader(name=settings.API_KEY_NAME, auto_error=False)
 async def get_api_key(api_key_header: str = Security(api_key_header)):
     if api_key_header == settings.API_KEY:
         return api_key_header
+    else:
+        raise HTTPException(
+            status_code=HTTP_403_FORBIDDEN, detail="Could not validate credentials"
+        )
+
+async def get_admin_api_key(api_key_header: str = Security(api_key_header)):
+    # Admin endpoints stay locked until ADMIN_API_KEY is configured
+    if settings.ADMIN_API_KEY and api_key_header == settings.ADMIN_API_KEY:
+        return api_key_header
     else:
         raise HTTPException(
             status_code=HTTP_403_FORBIDDEN, detail="Could not validate credentials"
@@ -1,13 +1,29 @@
+from contextlib import asynccontextmanager
+import uvicorn
 from fastapi import FastAPI
-from .api import endpoints
+from .api import endpoints, admin
 from .core.config import settings
+from .services.lifecycle import start_warm_up, shut_down, scrape_tracker
 from .services.prometheus_metrics import PrometheusMiddleware, metrics
+from .services.tracing import TracingMiddleware
 from starlette.middleware.cors import CORSMiddleware
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm Redis, the HTTP session, the browser and MongoDB in parallel so the
+    # first request after a cold start doesn't pay for them. It runs in the
+    # background, so /health can report "starting" until they are ready
+    start_warm_up()
+    yield
+    # Uvicorn has already drained in-flight requests (see DrainingServer);
+    # flush and close every connection
+    await shut_down()
+
 app = FastAPI(
     title="Product Scraper API",
     description="An optimized API for scraping product information from websites with Redis caching",
     version="1.2.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -20,21 +36,34 @@ app.add_middleware(
 )
 
 app.add_middleware(PrometheusMiddleware)
+app.add_middleware(TracingMiddleware)
 
 app.include_router(endpoints.router)
+app.include_router(admin.router)
 
 app.add_route("/metrics", metrics)
 
-@app.on_event("startup")
-async def startup_event():
-    # Initializing the Redis client
-    pass
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    # Close any closing connections
-    pass
+class DrainingServer(uvicorn.Server):
+    """Uvicorn server that starts draining scrapes as soon as the exit signal arrives.
+
+    Uvicorn stops listening and waits for open requests before it sends the
+    lifespan shutdown event, so the drain has to start at the signal and its
+    limit has to be uvicorn's graceful-shutdown timeout: after
+    SHUTDOWN_DRAIN_TIMEOUT seconds the remaining requests are cancelled and
+    the lifespan still flushes persistence and closes the browser.
+    """
+
+    def handle_exit(self, sig, frame):
+        scrape_tracker.draining = True
+        super().handle_exit(sig, frame)
+
+
+def server_config(host: str = "0.0.0.0", port: int = 8000) -> uvicorn.Config:
+    return uvicorn.Config(
+        app, host=host, port=port, timeout_graceful_shutdown=settings.SHUTDOWN_DRAIN_TIMEOUT
+    )
+
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    DrainingServer(server_config()).run()
\ No newline at end of file
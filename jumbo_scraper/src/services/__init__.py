@@ -1,3 +1,4 @@
 from .scraper import scrape_products, RateLimiter
+from .persistence import ProductPersistence
 
-__all__ = ["scrape_products", "RateLimiter"]
\ No newline at end of file
+__all__ = ["scrape_products", "RateLimiter", "ProductPersistence"]
\ No newline at end of file
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from ..core.config import settings
+from ..utils.redis_helper import init_redis, close_redis
+from .persistence import start_persistence, stop_persistence
+from .prometheus_metrics import STARTUP_DURATION_SECONDS
+from .tracing import flush_traces
+from .scraper import start_http_session, close_http_session, start_browser, close_browser, import_parser
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeTracker:
+    """Counts in-flight scrapes so shutdown can wait for them to finish."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.draining = False
+        self._idle: Optional[asyncio.Event] = None
+
+    def _idle_event(self) -> asyncio.Event:
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            self._idle.set()
+        return self._idle
+
+    @asynccontextmanager
+    async def track(self):
+        idle = self._idle_event()
+        self.in_flight += 1
+        idle.clear()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Stops accepting scrapes and waits for in-flight ones. Returns False on timeout."""
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle_event().wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Shutdown drain timed out with {self.in_flight} scrapes in flight")
+            return False
+
+
+scrape_tracker = ScrapeTracker()
+
+# Components that have finished warming up, keyed by name
+readiness: Dict[str, bool] = {}
+
+_warm_up_task: Optional[asyncio.Task] = None
+
+
+async def _warm(name: str, coro) -> float:
+    start = time.perf_counter()
+    try:
+        await coro
+        readiness[name] = True
+    except Exception as e:
+        readiness[name] = False
+        logger.error(f"Warm-up of {name} failed: {str(e)}")
+    duration = time.perf_counter() - start
+    STARTUP_DURATION_SECONDS.labels(component=name).set(duration)
+    return duration
+
+
+async def warm_up() -> Dict[str, float]:
+    """Initializes Redis, the HTTP session, the browser and MongoDB concurrently.
+
+    A component that fails to warm up is logged and reported through the health
+    endpoint instead of aborting startup; scraping falls back to lazy
+    initialization on first use.
+    """
+    start = time.perf_counter()
+    components = {
+        "redis": init_redis(),
+        "http_session": start_http_session(),
+        "browser": start_browser(),
+        "parser": import_parser(),
+        "mongodb": start_persistence(),
+    }
+    tasks = {name: asyncio.ensure_future(_warm(name, coro)) for name, coro in components.items()}
+    try:
+        done, pending = await asyncio.wait(tasks.values(), timeout=settings.STARTUP_TIMEOUT)
+    except asyncio.CancelledError:
+        for task in tasks.values():
+            task.cancel()
+        raise
+    for task in pending:
+        task.cancel()
+    durations = {name: task.result() for name, task in tasks.items() if task in done}
+
+    total = time.perf_counter() - start
+    STARTUP_DURATION_SECONDS.labels(component="total").set(total)
+    logger.info(f"Warm-up finished in {total:.2f}s: " + ", ".join(f"{name}={d:.2f}s" for name, d in durations.items()))
+    return durations
+
+
+def start_warm_up() -> asyncio.Task:
+    """Runs ``warm_up`` in the background.
+
+    The server accepts requests meanwhile: the health endpoint reports
+    "starting" and scrapes initialize whatever is not warm yet on first use.
+    """
+    global _warm_up_task
+    _warm_up_task = asyncio.ensure_future(warm_up())
+    return _warm_up_task
+
+
+def warming_up() -> bool:
+    return _warm_up_task is not None and not _warm_up_task.done()
+
+
+async def shut_down():
+    """Releases every warmed-up resource once scrapes have drained.
+
+    Under DrainingServer uvicorn has already waited for (or cancelled) every
+    request, so the drain here only matters when the app runs without a
+    graceful-shutdown limit.
+    """
+    if warming_up():
+        _warm_up_task.cancel()
+        await asyncio.gather(_warm_up_task, return_exceptions=True)
+    await scrape_tracker.drain(settings.SHUTDOWN_DRAIN_TIMEOUT)
+    readiness.clear()
+    results = await asyncio.gather(
+        stop_persistence(),
+        close_browser(),
+        close_http_session(),
+        close_redis(),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"Error during shutdown: {str(result)}")
+    flush_traces()
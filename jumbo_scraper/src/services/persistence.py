@@ -0,0 +1,221 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, UpdateOne
+
+from ..core.config import settings
+from .prometheus_metrics import (
+    PERSISTED_PRODUCTS_TOTAL,
+    PRICE_CHANGES_TOTAL,
+    PERSISTENCE_DROPPED_TOTAL,
+    PERSISTENCE_ERRORS_TOTAL,
+)
+
+logger = logging.getLogger(__name__)
+
+ProductKey = Tuple[str, str]
+
+
+class ProductPersistence:
+    """Buffers scrape results and writes them to MongoDB in batches.
+
+    Results are queued with ``enqueue`` (which never waits on the database) and
+    flushed by a background task, either when ``batch_size`` snapshots have
+    accumulated or every ``flush_interval`` seconds. Product snapshots are
+    bulk-upserted keyed by ``(url, name)``; a price history document is only
+    written when the price or promo price differs from the stored snapshot.
+    """
+
+    def __init__(self, products, price_history, batch_size: int = 100,
+                 flush_interval: float = 2.0, max_queue_size: int = 1000):
+        self.products = products
+        self.price_history = price_history
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def enqueue(self, result: Dict[str, Any]) -> bool:
+        """Queues a scrape result for persistence; drops it if the buffer is full."""
+        try:
+            self._queue.put_nowait(result)
+            return True
+        except asyncio.QueueFull:
+            PERSISTENCE_DROPPED_TOTAL.inc()
+            logger.warning(f"Persistence queue full, dropping result for {result.get('url')}")
+            return False
+
+    async def ping(self):
+        await self.products.database.command("ping")
+
+    async def start(self):
+        self._worker = asyncio.create_task(self._run())
+
+    async def _ensure_indexes(self):
+        try:
+            await self.products.create_index([("url", ASCENDING), ("name", ASCENDING)], unique=True)
+            await self.price_history.create_index(
+                [("url", ASCENDING), ("name", ASCENDING), ("recorded_at", ASCENDING)]
+            )
+        except Exception as e:
+            logger.error(f"Error creating MongoDB indexes: {str(e)}")
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Stops the worker and flushes buffered results.
+
+        If that takes longer than ``timeout`` seconds, for instance because
+        MongoDB is unreachable, the worker is cancelled and the results still
+        buffered are dropped.
+        """
+        self._stopping = True
+        worker = self._worker
+        try:
+            await asyncio.wait_for(self._finish(), timeout=timeout)
+        except asyncio.TimeoutError:
+            if worker is not None:
+                worker.cancel()
+                await asyncio.gather(worker, return_exceptions=True)
+            dropped = self._queue.qsize()
+            PERSISTENCE_DROPPED_TOTAL.inc(dropped)
+            logger.error(f"Persistence stop timed out after {timeout}s, dropping {dropped} buffered results")
+        finally:
+            self._worker = None
+
+    async def _finish(self):
+        # Let the worker finish its current flush instead of cancelling it mid-write
+        if self._worker is not None:
+            await asyncio.shield(self._worker)
+        # Flush whatever is still buffered before shutting down
+        while not self._queue.empty():
+            await self.flush(self._drain())
+
+    async def _run(self):
+        # Index creation runs in the worker so an unreachable database never delays startup
+        await self._ensure_indexes()
+        while not self._stopping:
+            try:
+                first = await asyncio.wait_for(self._queue.get(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                continue
+            batch = [first] + self._drain(self.batch_size - 1)
+            await self.flush(batch)
+
+    def _drain(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        limit = self.batch_size if limit is None else limit
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def flush(self, results: List[Dict[str, Any]]):
+        """Writes a batch of scrape results. Errors are logged, never raised."""
+        snapshots = self._collect_snapshots(results)
+        if not snapshots:
+            return
+        try:
+            previous = await self._load_previous(list(snapshots))
+            now = datetime.now(timezone.utc)
+            operations = []
+            history = []
+            for (url, name), product in snapshots.items():
+                price, promo_price = product["price"], product["promo_price"]
+                operations.append(UpdateOne(
+                    {"url": url, "name": name},
+                    {
+                        "$set": {"price": price, "promo_price": promo_price, "last_seen": now},
+                        "$setOnInsert": {"first_seen": now},
+                    },
+                    upsert=True,
+                ))
+                if previous.get((url, name)) != (price, promo_price):
+                    history.append({
+                        "url": url,
+                        "name": name,
+                        "price": price,
+                        "promo_price": promo_price,
+                        "recorded_at": now,
+                    })
+
+            await self.products.bulk_write(operations, ordered=False)
+            if history:
+                await self.price_history.insert_many(history, ordered=False)
+            PERSISTED_PRODUCTS_TOTAL.inc(len(operations))
+            PRICE_CHANGES_TOTAL.inc(len(history))
+        except Exception as e:
+            PERSISTENCE_ERRORS_TOTAL.inc()
+            logger.error(f"Error persisting {len(snapshots)} products: {str(e)}")
+
+    @staticmethod
+    def _collect_snapshots(results: List[Dict[str, Any]]) -> Dict[ProductKey, Dict[str, Any]]:
+        # Later results for the same product win, so each key is written once per batch
+        snapshots = {}
+        for result in results:
+            for product in result.get("products", []):
+                snapshots[(result["url"], product["name"])] = product
+        return snapshots
+
+    async def _load_previous(self, keys: List[ProductKey]) -> Dict[ProductKey, Tuple[str, str]]:
+        cursor = self.products.find(
+            {"$or": [{"url": url, "name": name} for url, name in keys]},
+            {"_id": 0, "url": 1, "name": 1, "price": 1, "promo_price": 1},
+        )
+        documents = await cursor.to_list(length=len(keys))
+        return {
+            (doc["url"], doc["name"]): (doc.get("price"), doc.get("promo_price"))
+            for doc in documents
+        }
+
+
+product_persistence: Optional[ProductPersistence] = None
+
+
+async def start_persistence():
+    global product_persistence
+    if not settings.MONGODB_URL:
+        logger.info("MONGODB_URL not set, scrape results will not be persisted")
+        return
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(
+        settings.MONGODB_URL,
+        maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGODB_MAX_IDLE_TIME_MS,
+    )
+    database = client[settings.mongodb_database]
+    product_persistence = ProductPersistence(
+        database["products"],
+        database["price_history"],
+        batch_size=settings.PERSISTENCE_BATCH_SIZE,
+        flush_interval=settings.PERSISTENCE_FLUSH_INTERVAL,
+        max_queue_size=settings.PERSISTENCE_MAX_QUEUE_SIZE,
+    )
+    await product_persistence.start()
+
+
+async def stop_persistence():
+    global product_persistence
+    if product_persistence is not None:
+        await product_persistence.stop(timeout=settings.PERSISTENCE_STOP_TIMEOUT)
+        product_persistence.products.database.client.close()
+        product_persistence = None
+
+
+async def persistence_status() -> str:
+    if product_persistence is None:
+        return "disabled"
+    try:
+        # Motor waits up to 30s for server selection; the health check can't
+        await asyncio.wait_for(product_persistence.ping(), timeout=settings.MONGODB_PING_TIMEOUT)
+        return "connected"
+    except Exception:
+        return "disconnected"
+
+
+def persist_result(result: Dict[str, Any]):
+    if product_persistence is not None:
+        product_persistence.enqueue(result)
@@ -0,0 +1,92 @@
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profiler for a single thread.
+
+    A background thread snapshots the target thread's stack every ``interval``
+    seconds via ``sys._current_frames``; nothing is installed in the profiled
+    thread, so overhead is limited to the sampling itself. Results are returned
+    in collapsed-stack format (``outer;inner;leaf count``), ready for flamegraph
+    tools such as speedscope or ``flamegraph.pl``.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+
+    def run(self, seconds: float):
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[self._collapse(frame)] += 1
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+
+async def profile_event_loop(seconds: float, interval: float = 0.005) -> str:
+    """Samples the event loop thread's CPU stacks for ``seconds`` seconds."""
+    profiler = SamplingProfiler(threading.get_ident(), interval)
+    # The sampler sleeps in a worker thread while the loop keeps serving requests
+    await asyncio.to_thread(profiler.run, seconds)
+    return profiler.collapsed()
+
+
+async def measure_loop_lag(seconds: float, interval: float = 0.01) -> Dict[str, float]:
+    """Measures how late the event loop wakes up from short sleeps, in seconds."""
+    lags: List[float] = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.monotonic() - start - interval))
+    lags.sort()
+    return {
+        "samples": len(lags),
+        "mean": sum(lags) / len(lags) if lags else 0.0,
+        "p99": lags[int(len(lags) * 0.99)] if lags else 0.0,
+        "max": lags[-1] if lags else 0.0,
+    }
+
+
+def dump_tasks() -> List[Dict[str, Any]]:
+    """Lists every pending asyncio task with the stack it is suspended at."""
+    current = asyncio.current_task()
+    tasks = []
+    for task in asyncio.all_tasks():
+        if task is current:
+            continue
+        tasks.append({
+            "name": task.get_name(),
+            "coroutine": getattr(task.get_coro(), "__qualname__", repr(task.get_coro())),
+            "stack": [
+                f"{frame.f_code.co_name} ({frame.f_code.co_filename}:{frame.f_lineno})"
+                for frame in task.get_stack()
+            ],
+        })
+    return tasks
+
+
+async def task_dump(seconds: float) -> Dict[str, Any]:
+    """Measures event-loop lag for ``seconds`` seconds, then dumps all tasks."""
+    loop_lag = await measure_loop_lag(seconds)
+    return {"loop_lag_seconds": loop_lag, "tasks": dump_tasks()}
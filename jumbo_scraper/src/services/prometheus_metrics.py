@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram, generate_latest, CollectorRegistry
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CollectorRegistry
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
@@ -12,6 +12,11 @@ SCRAPE_REQUESTS_TOTAL = Counter('scrape_requests_total', 'Total number of scrape
 SUCCESSFUL_SCRAPES_TOTAL = Counter('successful_scrapes_total', 'Total number of successful scrapes', registry=REGISTRY)
 SCRAPE_ERRORS_TOTAL = Counter('scrape_errors_total', 'Total number of scrape errors', registry=REGISTRY)
 SCRAPE_DURATION_SECONDS = Histogram('scrape_duration_seconds', 'Duration of scrape requests', buckets=[0.1, 0.5, 1, 2, 5, 10, 30, 60, 120], registry=REGISTRY)
+PERSISTED_PRODUCTS_TOTAL = Counter('persisted_products_total', 'Total number of product snapshots written to MongoDB', registry=REGISTRY)
+PRICE_CHANGES_TOTAL = Counter('price_changes_total', 'Total number of price history entries written', registry=REGISTRY)
+PERSISTENCE_DROPPED_TOTAL = Counter('persistence_dropped_total', 'Total number of scrape results dropped because the persistence queue was full', registry=REGISTRY)
+PERSISTENCE_ERRORS_TOTAL = Counter('persistence_errors_total', 'Total number of failed persistence flushes', registry=REGISTRY)
+STARTUP_DURATION_SECONDS = Gauge('startup_duration_seconds', 'Time spent warming up each component at startup', ['component'], registry=REGISTRY)
 
 def initialize_metrics():
     # This function is now empty as we're initializing metrics at module level
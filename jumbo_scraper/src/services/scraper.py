@@ -1,13 +1,14 @@
 import asyncio
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
-from bs4 import BeautifulSoup
 import logging
-from typing import Dict, Any
-import aiohttp
+from typing import Dict, Any, Optional
 from ..models.product import Product
+from .tracing import start_span, traced
 import time
 from urllib.parse import urlparse
 
+# playwright, bs4 and aiohttp are imported lazily: they dominate import time and
+# are loaded in parallel during the application warm-up instead of at module import.
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -29,59 +30,128 @@ class RateLimiter:
 
 rate_limiter = RateLimiter(calls=1, period=1)  # 1 request per second
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+_http_session = None
+_playwright = None
+_browser = None
+_browser_lock: Optional[asyncio.Lock] = None
+
+def _get_browser_lock() -> asyncio.Lock:
+    # Created lazily so the lock binds to the server's event loop, not the import-time one
+    global _browser_lock
+    if _browser_lock is None:
+        _browser_lock = asyncio.Lock()
+    return _browser_lock
+
+async def start_http_session():
+    global _http_session
+    import aiohttp
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession()
+    return _http_session
+
+async def close_http_session():
+    global _http_session
+    if _http_session is not None:
+        await _http_session.close()
+        _http_session = None
+
+async def start_browser():
+    global _playwright, _browser
+    async with _get_browser_lock():
+        if _browser is not None and _browser.is_connected():
+            return _browser
+        from playwright.async_api import async_playwright
+        if _playwright is None:
+            _playwright = await async_playwright().start()
+        _browser = await _playwright.chromium.launch(headless=True)
+        return _browser
+
+async def close_browser():
+    global _playwright, _browser
+    async with _get_browser_lock():
+        if _browser is not None:
+            await _browser.close()
+            _browser = None
+        if _playwright is not None:
+            await _playwright.stop()
+            _playwright = None
+
+def browser_ready() -> bool:
+    return _browser is not None and _browser.is_connected()
+
+def http_session_ready() -> bool:
+    return _http_session is not None and not _http_session.closed
+
+async def import_parser():
+    # Import bs4 off the event loop so it overlaps with the browser launch
+    await asyncio.to_thread(__import__, "bs4")
+
+@traced("scraper.is_valid_url")
 async def is_valid_url(url: str) -> bool:
+    import aiohttp
+    session = await start_http_session()
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.head(url, allow_redirects=True) as response:
-                return response.status < 400
+        async with session.head(url, allow_redirects=True) as response:
+            return response.status < 400
     except aiohttp.ClientError:
         return False
 
+@traced("scrape_products")
 async def scrape_products(url: str, timeout: int = 30000) -> Dict[str, Any]:
     if not await is_valid_url(url):
         logger.error(f"Invalid URL: {url}")
         return {"url": url, "products": [], "error": "Invalid URL"}
 
-    await rate_limiter.wait()
+    with start_span("scraper.rate_limit_wait"):
+        await rate_limiter.wait()
 
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            )
-            page = await context.new_page()
-            
-            try:
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+        from bs4 import BeautifulSoup
+
+        browser = await start_browser()
+        context = await browser.new_context(
+            viewport={"width": 1920, "height": 1080},
+            user_agent=USER_AGENT
+        )
+        page = await context.new_page()
+
+        try:
+            with start_span("scraper.page_load", url=url):
                 await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
                 content = await page.content()
-            except PlaywrightTimeoutError:
-                logger.error(f"Timeout occurred while loading {url}")
-                return {"url": url, "products": [], "error": "Timeout"}
-            finally:
-                await browser.close()
-
-        soup = BeautifulSoup(content, 'html.parser')
-        product_elements = soup.select('.vtex-product-summary-2-x-element')
-
-        products = []
-        for elem in product_elements:
-            try:
-                name_elem = elem.select_one('.vtex-product-summary-2-x-productNameContainer')
-                price_elem = elem.select_one('.tiendasjumboqaio-jumbo-minicart-2-x-price')
-                promo_price_elem = elem.select_one('.tiendasjumboqaio-jumbo-minicart-2-x-priceWithDiscounts')
-
-                name = name_elem.text.strip() if name_elem else "N/A"
-                price = price_elem.text.strip() if price_elem else "N/A"
-                promo_price = promo_price_elem.text.strip() if promo_price_elem else price
-
-                product = Product(name=name, price=price, promo_price=promo_price)
-                products.append(product.dict())
-            except ValueError as ve:
-                logger.warning(f"Skipping invalid product: {str(ve)}")
-            except Exception as e:
-                logger.error(f"Error processing product: {str(e)}")
+        except PlaywrightTimeoutError:
+            logger.error(f"Timeout occurred while loading {url}")
+            return {"url": url, "products": [], "error": "Timeout"}
+        finally:
+            await context.close()
+
+        with start_span("scraper.parse_products") as span:
+            soup = BeautifulSoup(content, 'html.parser')
+            product_elements = soup.select('.vtex-product-summary-2-x-element')
+
+            products = []
+            for elem in product_elements:
+                try:
+                    name_elem = elem.select_one('.vtex-product-summary-2-x-productNameContainer')
+                    price_elem = elem.select_one('.tiendasjumboqaio-jumbo-minicart-2-x-price')
+                    promo_price_elem = elem.select_one('.tiendasjumboqaio-jumbo-minicart-2-x-priceWithDiscounts')
+
+                    name = name_elem.text.strip() if name_elem else "N/A"
+                    price = price_elem.text.strip() if price_elem else "N/A"
+                    promo_price = promo_price_elem.text.strip() if promo_price_elem else price
+
+                    product = Product(name=name, price=price, promo_price=promo_price)
+                    products.append(product.dict())
+                except ValueError as ve:
+                    logger.warning(f"Skipping invalid product: {str(ve)}")
+                except Exception as e:
+                    logger.error(f"Error processing product: {str(e)}")
+
+            if span is not None:
+                span.set_attribute("products.count", len(products))
 
         logger.info(f"Successfully scraped {len(products)} products from {url}")
         return {"url": url, "products": products}
@@ -0,0 +1,216 @@
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "product-scraper-api"
+
+# OTLP span status codes
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_span_id", "name", "start_time", "end_time", "attributes", "status", "status_message")
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+        self.attributes = attributes
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class FileSpanExporter:
+    """
+    Writes finished spans to a file as OTLP/JSON, one ``ExportTraceServiceRequest``
+    per line, so the file can be replayed into any OpenTelemetry collector.
+
+    Spans are buffered, and every full batch is serialized and written by a
+    background thread, so the request that completes a batch never blocks the
+    event loop on file I/O. If the writer falls more than
+    ``max_pending_batches`` behind, new batches are dropped.
+    """
+
+    def __init__(self, path: str, batch_size: int = 64, max_pending_batches: int = 16):
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer: List[Span] = []
+        self._lock = threading.Lock()
+        self._batches: queue.Queue = queue.Queue(maxsize=max_pending_batches)
+        self._writer: Optional[threading.Thread] = None
+
+    def export(self, span: Span):
+        with self._lock:
+            self._buffer.append(span)
+            if len(self._buffer) < self.batch_size:
+                return
+            spans, self._buffer = self._buffer, []
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._writer.start()
+        try:
+            self._batches.put_nowait(spans)
+        except queue.Full:
+            logger.warning(f"Trace writer is behind, dropping {len(spans)} spans")
+
+    def flush(self):
+        """Waits for pending batches, then writes the spans still buffered."""
+        self._batches.join()
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        if spans:
+            self._write(spans)
+
+    def _run(self):
+        while True:
+            spans = self._batches.get()
+            try:
+                self._write(spans)
+            finally:
+                self._batches.task_done()
+
+    def _write(self, spans: List[Span]):
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+        try:
+            with open(self.path, "a") as trace_file:
+                trace_file.write(json.dumps(request) + "\n")
+        except OSError as e:
+            logger.error(f"Error writing traces to {self.path}: {str(e)}")
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+exporter: Optional[FileSpanExporter] = (
+    FileSpanExporter(settings.TRACING_EXPORT_FILE) if settings.TRACING_ENABLED else None
+)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def start_span(name: str, trace_id: Optional[str] = None, parent_span_id: Optional[str] = None, **attributes):
+    """
+    Opens a span as a child of the current one. Yields None when tracing is
+    disabled, so instrumented code costs a single check.
+    """
+    if exporter is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    if parent is not None and trace_id is None:
+        trace_id, parent_span_id = parent.trace_id, parent.span_id
+    span = Span(name, trace_id or os.urandom(16).hex(), parent_span_id, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.status = STATUS_ERROR
+        span.status_message = str(e)
+        raise
+    finally:
+        span.end_time = time.time_ns()
+        _current_span.reset(token)
+        exporter.export(span)
+
+
+def traced(name: str):
+    """Decorator wrapping a coroutine function in a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with start_span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def parse_traceparent(header: Optional[str]):
+    """Extracts (trace_id, parent_span_id) from a W3C ``traceparent`` header."""
+    if not header:
+        return None, None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None
+    return parts[1], parts[2]
+
+
+def flush_traces():
+    if exporter is not None:
+        exporter.flush()
+
+
+class TracingMiddleware(BaseHTTPMiddleware):
+    """Opens the root span of each request, continuing an incoming ``traceparent``."""
+
+    async def dispatch(self, request: Request, call_next):
+        if exporter is None:
+            return await call_next(request)
+
+        trace_id, parent_span_id = parse_traceparent(request.headers.get("traceparent"))
+        with start_span(
+            f"{request.method} {request.url.path}",
+            trace_id=trace_id,
+            parent_span_id=parent_span_id,
+            **{"http.method": request.method, "http.target": request.url.path},
+        ) as span:
+            response = await call_next(request)
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.status = STATUS_ERROR
+        response.headers["traceparent"] = f"00-{span.trace_id}-{span.span_id}-01"
+        return response
@@ -1,3 +1,4 @@
-from .redis_helper import get_cached_result, set_cached_result
+from .redis_helper import get_cached_result, set_cached_result, get_redis_client, init_redis, close_redis
+from .http_cache import negotiate_encoding, compress, match_etag
 
-__all__ = ["get_cached_result", "set_cached_result"]
\ No newline at end of file
+__all__ = ["get_cached_result", "set_cached_result", "get_redis_client", "init_redis", "close_redis", "negotiate_encoding", "compress", "match_etag"]
\ No newline at end of file
@@ -0,0 +1,76 @@
+import gzip
+from typing import List, Optional
+from .redis_helper import compute_etag
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+IDENTITY = "identity"
+GZIP = "gzip"
+BROTLI = "br"
+
+def available_encodings() -> List[str]:
+    # Preferred first when the client accepts several codings equally
+    return [BROTLI, GZIP] if brotli is not None else [GZIP]
+
+def negotiate_encoding(accept_encoding: Optional[str], body_size: int, min_size: int) -> str:
+    """Picks the content coding for a response from the Accept-Encoding header."""
+    if not accept_encoding or body_size < min_size:
+        return IDENTITY
+
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    best, best_quality = IDENTITY, 0.0
+    for encoding in available_encodings():
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == BROTLI:
+        return brotli.compress(body, quality=9)
+    if encoding == GZIP:
+        # mtime=0 keeps the output deterministic for identical bodies
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    return body
+
+def representation_etag(etag: str, encoding: str) -> str:
+    """Each content coding is a distinct representation, so it gets its own strong ETag."""
+    if encoding == IDENTITY:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+def combine_etags(etags: List[str]) -> str:
+    """Derives the ETag of a list response from the ETags of its items."""
+    return compute_etag(",".join(etags).encode("utf-8"))
+
+def match_etag(if_none_match: Optional[str], etag: Optional[str]) -> Optional[str]:
+    """
+    Checks If-None-Match against an identity ETag and all of its encoded variants.
+    Returns the matching ETag (to echo back on the 304) or None.
+    """
+    if not if_none_match or not etag:
+        return None
+    if if_none_match.strip() == "*":
+        return etag
+    variants = {representation_etag(etag, encoding) for encoding in (IDENTITY, GZIP, BROTLI)}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in variants:
+            return candidate
+    return None
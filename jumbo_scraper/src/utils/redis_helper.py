@@ -1,22 +1,116 @@
+import hashlib
 import json
-from typing import Dict, Any
+from typing import Dict, Any, List, NamedTuple, Optional
 from redis import asyncio as aioredis
 from ..core.config import settings
+from ..services.tracing import traced
 
-redis_client = aioredis.from_url(
-    settings.redis_url,
-    encoding="utf-8",
-    decode_responses=True,
-    max_connections=settings.REDIS_MAX_CONNECTIONS,
-    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
-    retry_on_timeout=settings.REDIS_RETRY_ON_TIMEOUT
-)
+# Each cached result is a hash holding the JSON body, its ETag and any
+# precompressed copies of the body (one field per content coding).
+CACHE_KEY_PREFIX = "scrape:"
+BODY_FIELD = "identity"
+ETAG_FIELD = "etag"
+SIZE_FIELD = "size"
+LIST_KEY_PREFIX = "scrape_multiple:"
+
+# HSETNX only if the entry still exists, so a compressed copy never outlives its
+# source body or creates an entry without an expiry
+SET_IF_EXISTS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[2])
+end
+return 0
+"""
+
+class CacheMetadata(NamedTuple):
+    etag: str
+    size: int
+
+redis_client: Optional[aioredis.Redis] = None
+
+def get_redis_client() -> aioredis.Redis:
+    # Created on first use (normally during the app warm-up) rather than at import time.
+    # Responses are left as bytes because cache entries hold compressed bodies.
+    global redis_client
+    if redis_client is None:
+        redis_client = aioredis.from_url(
+            settings.redis_url,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            retry_on_timeout=settings.REDIS_RETRY_ON_TIMEOUT
+        )
+    return redis_client
+
+async def init_redis():
+    # PING opens the first pooled connection so the first request doesn't pay for it
+    await get_redis_client().ping()
+
+async def close_redis():
+    global redis_client
+    if redis_client is not None:
+        await redis_client.close()
+        redis_client = None
+
+def cache_key(url: str) -> str:
+    return CACHE_KEY_PREFIX + url
+
+def encode_result(result: Any) -> bytes:
+    return json.dumps(result).encode("utf-8")
+
+def compute_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+@traced("redis.get_cached_metadata")
+async def get_cached_metadata(urls: List[str]) -> List[Optional[CacheMetadata]]:
+    # Only the ETag and size fields are read, so conditional requests never touch the payload
+    async with get_redis_client().pipeline(transaction=False) as pipe:
+        for url in urls:
+            pipe.hmget(cache_key(url), ETAG_FIELD, SIZE_FIELD)
+        rows = await pipe.execute()
+    return [
+        CacheMetadata(etag.decode(), int(size)) if etag and size else None
+        for etag, size in rows
+    ]
+
+@traced("redis.get_cached_bodies")
+async def get_cached_bodies(urls: List[str], encoding: str = BODY_FIELD) -> List[Optional[bytes]]:
+    async with get_redis_client().pipeline(transaction=False) as pipe:
+        for url in urls:
+            pipe.hget(cache_key(url), encoding)
+        return await pipe.execute()
+
+@traced("redis.get_cached_body")
+async def get_cached_body(url: str, encoding: str = BODY_FIELD) -> Optional[bytes]:
+    return await get_redis_client().hget(cache_key(url), encoding)
+
+@traced("redis.set_cached_encoding")
+async def set_cached_encoding(url: str, encoding: str, body: bytes):
+    await get_redis_client().eval(SET_IF_EXISTS_SCRIPT, 1, cache_key(url), encoding, body)
+
+@traced("redis.get_cached_list_body")
+async def get_cached_list_body(etag: str, encoding: str) -> Optional[bytes]:
+    return await get_redis_client().get(f"{LIST_KEY_PREFIX}{etag}:{encoding}")
+
+@traced("redis.set_cached_list_body")
+async def set_cached_list_body(etag: str, encoding: str, body: bytes):
+    await get_redis_client().setex(f"{LIST_KEY_PREFIX}{etag}:{encoding}", settings.REDIS_CACHE_EXPIRATION, body)
 
 async def get_cached_result(url: str) -> Dict[str, Any]:
-    cached_result = await redis_client.get(url)
+    cached_result = await get_cached_body(url)
     if cached_result:
         return json.loads(cached_result)
     return None
 
-async def set_cached_result(url: str, result: Dict[str, Any]):
-    await redis_client.setex(url, settings.REDIS_CACHE_EXPIRATION, json.dumps(result))
\ No newline at end of file
+@traced("redis.cache_result_body")
+async def cache_result_body(url: str, body: bytes) -> str:
+    """Stores an encoded result, replacing any previous entry and its compressed copies."""
+    etag = compute_etag(body)
+    async with get_redis_client().pipeline(transaction=True) as pipe:
+        pipe.delete(cache_key(url))
+        pipe.hset(cache_key(url), mapping={BODY_FIELD: body, ETAG_FIELD: etag, SIZE_FIELD: len(body)})
+        pipe.expire(cache_key(url), settings.REDIS_CACHE_EXPIRATION)
+        await pipe.execute()
+    return etag
+
+async def set_cached_result(url: str, result: Dict[str, Any]) -> str:
+    return await cache_result_body(url, encode_result(result))
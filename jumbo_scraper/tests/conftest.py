@@ -0,0 +1,8 @@
+import os
+
+# Settings requires these at import time; real values are never contacted in tests
+os.environ.setdefault("REDIS_HOST", "redis://localhost")
+os.environ.setdefault("REDIS_PORT", "6379")
+os.environ.setdefault("REDIS_USERNAME", "")
+os.environ.setdefault("REDIS_PASSWORD", "")
+os.environ.setdefault("API_KEY", "test_api_key")
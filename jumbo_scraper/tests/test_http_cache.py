@@ -0,0 +1,96 @@
+import gzip
+import json
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, patch
+from src.main import app
+from src.utils.http_cache import GZIP, IDENTITY, negotiate_encoding, match_etag, representation_etag
+from src.utils.redis_helper import CacheMetadata, compute_etag, encode_result
+
+client = TestClient(app)
+
+HEADERS = {"X-API-Key": "test_api_key"}
+
+RESULT = {
+    "url": "https://example.com/",
+    "products": [{"name": f"Product {i}", "price": "10.00", "promo_price": "9.00"} for i in range(50)],
+}
+BODY = encode_result(RESULT)
+ETAG = compute_etag(BODY)
+
+@pytest.fixture
+def mock_cache():
+    store = {}
+    with patch("src.api.endpoints.get_cached_metadata", AsyncMock(return_value=[None])) as metadata, \
+         patch("src.api.endpoints.get_cached_body", AsyncMock(side_effect=lambda url, encoding=IDENTITY: store.get(encoding))), \
+         patch("src.api.endpoints.set_cached_encoding", AsyncMock(side_effect=lambda url, encoding, body: store.__setitem__(encoding, body))) as set_encoding, \
+         patch("src.api.endpoints.cache_result_body", AsyncMock(return_value=ETAG)):
+        yield metadata, store, set_encoding
+
+@pytest.fixture
+def mock_scrape_products():
+    with patch("src.api.endpoints.scrape_products", AsyncMock(return_value=RESULT)) as mock_scrape:
+        yield mock_scrape
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip", 10, 1024) == IDENTITY
+    assert negotiate_encoding(None, 4096, 1024) == IDENTITY
+    assert negotiate_encoding("gzip, deflate", 4096, 1024) == GZIP
+    assert negotiate_encoding("gzip;q=0, identity", 4096, 1024) == IDENTITY
+    assert negotiate_encoding("deflate", 4096, 1024) == IDENTITY
+
+def test_match_etag_accepts_encoded_variants():
+    assert match_etag(ETAG, ETAG) == ETAG
+    assert match_etag(f'"other", {representation_etag(ETAG, GZIP)}', ETAG) == representation_etag(ETAG, GZIP)
+    assert match_etag(f"W/{ETAG}", ETAG) == ETAG
+    assert match_etag('"other"', ETAG) is None
+    assert match_etag(None, ETAG) is None
+
+def test_scrape_returns_etag(mock_cache, mock_scrape_products):
+    response = client.post("/scrape", json={"url": "https://example.com"}, headers={**HEADERS, "Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == ETAG
+    assert response.json() == RESULT
+
+def test_scrape_not_modified_from_metadata(mock_cache, mock_scrape_products):
+    metadata, store, _ = mock_cache
+    metadata.return_value = [CacheMetadata(ETAG, len(BODY))]
+
+    response = client.post("/scrape", json={"url": "https://example.com"}, headers={**HEADERS, "If-None-Match": ETAG})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == ETAG
+    mock_scrape_products.assert_not_called()
+
+def test_scrape_compresses_once_and_reuses_cached_body(mock_cache, mock_scrape_products):
+    metadata, store, set_encoding = mock_cache
+    metadata.return_value = [CacheMetadata(ETAG, len(BODY))]
+    store[IDENTITY] = BODY
+
+    for _ in range(2):
+        response = client.post("/scrape", json={"url": "https://example.com"}, headers={**HEADERS, "Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == GZIP
+        assert response.headers["etag"] == representation_etag(ETAG, GZIP)
+        assert response.json() == RESULT
+
+    assert gzip.decompress(store[GZIP]) == BODY
+    set_encoding.assert_called_once()
+    mock_scrape_products.assert_not_called()
+
+def test_scrape_multiple_not_modified_from_metadata(mock_scrape_products):
+    other_etag = compute_etag(b"other")
+    with patch("src.api.endpoints.get_cached_metadata", AsyncMock(return_value=[CacheMetadata(ETAG, 10), CacheMetadata(other_etag, 10)])), \
+         patch("src.api.endpoints.get_cached_bodies", AsyncMock(return_value=[BODY, json.dumps(RESULT).encode()])), \
+         patch("src.api.endpoints.get_cached_list_body", AsyncMock(return_value=None)), \
+         patch("src.api.endpoints.set_cached_list_body", AsyncMock()):
+        response = client.post("/scrape_multiple", json={"urls": ["https://example.com", "https://example2.com"]}, headers=HEADERS)
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+        list_etag = response.headers["etag"]
+
+        response = client.post("/scrape_multiple", json={"urls": ["https://example.com", "https://example2.com"]}, headers={**HEADERS, "If-None-Match": list_etag})
+
+    assert response.status_code == 304
+    mock_scrape_products.assert_not_called()
@@ -0,0 +1,203 @@
+import asyncio
+import os
+import signal
+import socket
+import aiohttp
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, patch
+from src.main import app, DrainingServer, server_config
+from src.services import lifecycle
+from src.services.lifecycle import ScrapeTracker
+
+client = TestClient(app)
+
+@pytest.fixture
+def fresh_lifecycle():
+    tracker = ScrapeTracker()
+    with patch("src.api.endpoints.scrape_tracker", tracker), \
+         patch("src.main.scrape_tracker", tracker), \
+         patch.object(lifecycle, "scrape_tracker", tracker), \
+         patch.dict(lifecycle.readiness, clear=True):
+        yield tracker
+
+@pytest.fixture
+def mock_redis_client():
+    with patch("src.api.endpoints.get_redis_client") as mock_get_client:
+        mock_client = mock_get_client.return_value
+        mock_client.ping = AsyncMock(return_value=True)
+        yield mock_client
+
+@pytest.mark.asyncio
+async def test_drain_waits_for_in_flight_scrapes():
+    tracker = ScrapeTracker()
+    finished = []
+
+    async def scrape():
+        async with tracker.track():
+            await asyncio.sleep(0.05)
+            finished.append(True)
+
+    task = asyncio.ensure_future(scrape())
+    await asyncio.sleep(0)
+    assert tracker.in_flight == 1
+
+    assert await tracker.drain(timeout=1)
+    assert finished == [True]
+    assert tracker.draining
+    await task
+
+@pytest.mark.asyncio
+async def test_drain_times_out():
+    tracker = ScrapeTracker()
+
+    async def scrape():
+        async with tracker.track():
+            await asyncio.sleep(1)
+
+    task = asyncio.ensure_future(scrape())
+    await asyncio.sleep(0)
+
+    assert not await tracker.drain(timeout=0.01)
+    task.cancel()
+
+@pytest.mark.asyncio
+async def test_warm_up_reports_failed_components():
+    with patch.dict(lifecycle.readiness, clear=True), \
+         patch.object(lifecycle, "init_redis", AsyncMock(side_effect=ConnectionError("no redis"))), \
+         patch.object(lifecycle, "start_http_session", AsyncMock()), \
+         patch.object(lifecycle, "start_browser", AsyncMock()), \
+         patch.object(lifecycle, "import_parser", AsyncMock()), \
+         patch.object(lifecycle, "start_persistence", AsyncMock()):
+        durations = await lifecycle.warm_up()
+
+        assert set(durations) == {"redis", "http_session", "browser", "parser", "mongodb"}
+        assert lifecycle.readiness["redis"] is False
+        assert lifecycle.readiness["browser"] is True
+
+def test_health_starting_before_warm_up(fresh_lifecycle, mock_redis_client):
+    response = client.get("/health")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+    assert response.json()["redis"] == "connected"
+
+def test_health_starting_while_warm_up_runs(fresh_lifecycle, mock_redis_client):
+    browser_started = asyncio.Event()
+
+    async def slow_browser():
+        await browser_started.wait()
+
+    with patch.object(lifecycle, "init_redis", AsyncMock()), \
+         patch.object(lifecycle, "start_http_session", AsyncMock()), \
+         patch.object(lifecycle, "start_browser", slow_browser), \
+         patch.object(lifecycle, "import_parser", AsyncMock()), \
+         patch.object(lifecycle, "start_persistence", AsyncMock()), \
+         patch("src.api.endpoints.browser_ready", side_effect=browser_started.is_set), \
+         TestClient(app) as lifespan_client:
+        starting = lifespan_client.get("/health")
+        lifespan_client.portal.call(browser_started.set)
+        while lifecycle.warming_up():
+            lifespan_client.portal.call(asyncio.sleep, 0.01)
+        healthy = lifespan_client.get("/health")
+
+    assert starting.status_code == 503
+    assert starting.json()["status"] == "starting"
+    assert healthy.status_code == 200
+    assert healthy.json()["status"] == "healthy"
+
+def test_health_healthy_after_warm_up(fresh_lifecycle, mock_redis_client):
+    lifecycle.readiness.update({"redis": True, "browser": True})
+    with patch("src.api.endpoints.browser_ready", return_value=True):
+        response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+    assert response.json()["mongodb"] == "disabled"
+
+def test_health_stays_healthy_when_mongodb_unreachable(fresh_lifecycle, mock_redis_client):
+    lifecycle.readiness.update({"redis": True, "browser": True})
+
+    async def hanging_ping():
+        await asyncio.sleep(30)
+
+    persistence = AsyncMock(ping=hanging_ping)
+    with patch("src.api.endpoints.browser_ready", return_value=True), \
+         patch("src.services.persistence.product_persistence", persistence), \
+         patch("src.services.persistence.settings.MONGODB_PING_TIMEOUT", 0.01):
+        response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+    assert response.json()["mongodb"] == "disconnected"
+
+def test_scrape_rejected_while_draining(fresh_lifecycle):
+    fresh_lifecycle.draining = True
+
+    response = client.post(
+        "/scrape",
+        json={"url": "https://example.com"},
+        headers={"X-API-Key": "test_api_key"}
+    )
+
+    assert response.status_code == 503
+
+async def serve_until_sigterm(scrape_seconds, graceful_timeout):
+    """Serves the app, sends SIGTERM mid-scrape and returns the ordered shutdown events."""
+    events = []
+    scrape_started = asyncio.Event()
+
+    async def slow_scrape(*args):
+        scrape_started.set()
+        await asyncio.sleep(scrape_seconds)
+        events.append("scrape finished")
+        return {"url": "https://example.com"}
+
+    async def stop_persistence():
+        events.append("persistence flushed")
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    url = f"http://127.0.0.1:{port}/scrape"
+    config = server_config(host="127.0.0.1", port=port)
+    config.timeout_graceful_shutdown = graceful_timeout
+    server = DrainingServer(config)
+    with patch("src.api.endpoints._scrape", slow_scrape), \
+         patch.object(lifecycle, "init_redis", AsyncMock()), \
+         patch.object(lifecycle, "start_http_session", AsyncMock()), \
+         patch.object(lifecycle, "start_browser", AsyncMock()), \
+         patch.object(lifecycle, "import_parser", AsyncMock()), \
+         patch.object(lifecycle, "start_persistence", AsyncMock()), \
+         patch.object(lifecycle, "stop_persistence", stop_persistence), \
+         patch.object(lifecycle, "close_browser", AsyncMock()), \
+         patch.object(lifecycle, "close_http_session", AsyncMock()), \
+         patch.object(lifecycle, "close_redis", AsyncMock()):
+        serving = asyncio.ensure_future(server.serve(sockets=[sock]))
+        while not server.started:
+            await asyncio.sleep(0.01)
+        async with aiohttp.ClientSession() as session:
+            request = asyncio.ensure_future(session.post(
+                url, json={"url": "https://example.com"}, headers={"X-API-Key": "test_api_key"}
+            ))
+            await scrape_started.wait()
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.sleep(0.05)
+            events.append("draining" if lifecycle.scrape_tracker.draining else "accepting")
+            responses = await asyncio.gather(request, return_exceptions=True)
+            await asyncio.wait_for(serving, timeout=5)
+    return events, responses[0]
+
+@pytest.mark.asyncio
+async def test_sigterm_drains_in_flight_scrapes_before_flushing(fresh_lifecycle):
+    events, response = await serve_until_sigterm(scrape_seconds=0.3, graceful_timeout=5)
+
+    assert events == ["draining", "scrape finished", "persistence flushed"]
+    assert response.status == 200
+
+@pytest.mark.asyncio
+async def test_sigterm_cancels_scrapes_past_drain_timeout(fresh_lifecycle):
+    events, _ = await serve_until_sigterm(scrape_seconds=30, graceful_timeout=0.2)
+
+    # The scrape is cancelled, but persistence is still flushed
+    assert events == ["draining", "persistence flushed"]
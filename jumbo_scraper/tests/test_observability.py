@@ -0,0 +1,113 @@
+import json
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from src.main import app
+from src.core.config import settings
+from src.services import tracing
+from src.services.tracing import FileSpanExporter, Span, start_span, traced, parse_traceparent
+
+client = TestClient(app)
+
+ADMIN_HEADERS = {"X-API-Key": "admin_key"}
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    with patch.object(tracing, "exporter", FileSpanExporter(str(path))):
+        yield path
+
+@pytest.fixture
+def admin_key():
+    with patch.object(settings, "ADMIN_API_KEY", "admin_key"):
+        yield
+
+def read_spans(path):
+    spans = []
+    for line in path.read_text().splitlines():
+        for resource_spans in json.loads(line)["resourceSpans"]:
+            for scope_spans in resource_spans["scopeSpans"]:
+                spans.extend(scope_spans["spans"])
+    return {span["name"]: span for span in spans}
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_awaits(trace_file):
+    @traced("child")
+    async def child():
+        with start_span("grandchild", key="value"):
+            pass
+
+    with start_span("root"):
+        await child()
+    tracing.flush_traces()
+
+    spans = read_spans(trace_file)
+    assert spans["child"]["parentSpanId"] == spans["root"]["spanId"]
+    assert spans["grandchild"]["parentSpanId"] == spans["child"]["spanId"]
+    assert {s["traceId"] for s in spans.values()} == {spans["root"]["traceId"]}
+    assert spans["grandchild"]["attributes"] == [{"key": "key", "value": {"stringValue": "value"}}]
+
+@pytest.mark.asyncio
+async def test_span_records_errors(trace_file):
+    with pytest.raises(ValueError):
+        with start_span("failing"):
+            raise ValueError("boom")
+    tracing.flush_traces()
+
+    assert read_spans(trace_file)["failing"]["status"] == {"code": tracing.STATUS_ERROR, "message": "boom"}
+
+def test_full_batches_are_written_off_the_calling_thread(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = FileSpanExporter(str(path), batch_size=2)
+    writer_threads = []
+    write = exporter._write
+
+    def record_thread(spans):
+        writer_threads.append(threading.current_thread())
+        write(spans)
+
+    with patch.object(exporter, "_write", record_thread):
+        for name in ("a", "b", "c"):
+            exporter.export(Span(name, "0" * 32, None, {}))
+        exporter.flush()
+
+    assert set(read_spans(path)) == {"a", "b", "c"}
+    assert writer_threads[0] is not threading.current_thread()
+    assert writer_threads[1] is threading.current_thread()
+
+def test_spans_disabled_by_default():
+    with start_span("noop") as span:
+        assert span is None
+
+def test_parse_traceparent():
+    trace_id, span_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+    assert parse_traceparent(f"00-{trace_id}-{span_id}-01") == (trace_id, span_id)
+    assert parse_traceparent("garbage") == (None, None)
+
+def test_request_continues_incoming_trace(trace_file):
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    response = client.get("/metrics", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+    tracing.flush_traces()
+
+    assert response.headers["traceparent"].split("-")[1] == trace_id
+    assert read_spans(trace_file)["GET /metrics"]["traceId"] == trace_id
+
+def test_admin_requires_admin_key():
+    response = client.post("/admin/profile/cpu?seconds=0.1", headers={"X-API-Key": "test_api_key"})
+
+    assert response.status_code == 403
+
+def test_admin_cpu_profile(admin_key):
+    response = client.post("/admin/profile/cpu?seconds=0.1", headers=ADMIN_HEADERS)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in response.text.splitlines())
+
+def test_admin_task_dump(admin_key):
+    response = client.post("/admin/profile/tasks?seconds=0.05", headers=ADMIN_HEADERS)
+
+    assert response.status_code == 200
+    assert response.json()["loop_lag_seconds"]["samples"] > 0
+    assert isinstance(response.json()["tasks"], list)
@@ -0,0 +1,141 @@
+import asyncio
+import pytest
+from src.services.persistence import ProductPersistence
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length=None):
+        return self.documents[:length]
+
+
+class FakeCollection:
+    """In-memory stand-in for the subset of the Motor collection API we use."""
+
+    def __init__(self, documents=None):
+        self.documents = list(documents or [])
+        self.bulk_writes = []
+        self.indexes = []
+
+    async def create_index(self, keys, **kwargs):
+        self.indexes.append(keys)
+
+    def find(self, query, projection=None):
+        keys = {(q["url"], q["name"]) for q in query["$or"]}
+        return FakeCursor([d for d in self.documents if (d["url"], d["name"]) in keys])
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_writes.append(operations)
+
+    async def insert_many(self, documents, ordered=True):
+        self.documents.extend(documents)
+
+
+class FailingCollection(FakeCollection):
+    async def bulk_write(self, operations, ordered=True):
+        raise ConnectionError("MongoDB unavailable")
+
+
+class HangingCollection(FakeCollection):
+    async def bulk_write(self, operations, ordered=True):
+        await asyncio.sleep(30)
+
+
+def make_result(url, *products):
+    return {
+        "url": url,
+        "products": [{"name": name, "price": price, "promo_price": promo} for name, price, promo in products],
+    }
+
+
+@pytest.mark.asyncio
+async def test_flush_upserts_and_records_new_prices():
+    products, history = FakeCollection(), FakeCollection()
+    persistence = ProductPersistence(products, history)
+
+    await persistence.flush([make_result("https://example.com", ("Milk", "10.00", "9.00"), ("Bread", "5.00", "5.00"))])
+
+    assert len(products.bulk_writes) == 1
+    assert len(products.bulk_writes[0]) == 2
+    assert {(d["name"], d["price"], d["promo_price"]) for d in history.documents} == {
+        ("Milk", "10.00", "9.00"),
+        ("Bread", "5.00", "5.00"),
+    }
+
+
+@pytest.mark.asyncio
+async def test_flush_skips_history_when_price_unchanged():
+    products = FakeCollection([
+        {"url": "https://example.com", "name": "Milk", "price": "10.00", "promo_price": "9.00"},
+        {"url": "https://example.com", "name": "Bread", "price": "5.00", "promo_price": "5.00"},
+    ])
+    history = FakeCollection()
+    persistence = ProductPersistence(products, history)
+
+    await persistence.flush([make_result("https://example.com", ("Milk", "10.00", "9.00"), ("Bread", "5.00", "4.50"))])
+
+    assert len(products.bulk_writes[0]) == 2
+    assert [(d["name"], d["promo_price"]) for d in history.documents] == [("Bread", "4.50")]
+
+
+@pytest.mark.asyncio
+async def test_flush_deduplicates_products_within_batch():
+    products, history = FakeCollection(), FakeCollection()
+    persistence = ProductPersistence(products, history)
+
+    await persistence.flush([
+        make_result("https://example.com", ("Milk", "10.00", "9.00")),
+        make_result("https://example.com", ("Milk", "11.00", "11.00")),
+    ])
+
+    assert len(products.bulk_writes[0]) == 1
+    assert [d["price"] for d in history.documents] == ["11.00"]
+
+
+@pytest.mark.asyncio
+async def test_flush_error_is_not_raised():
+    history = FakeCollection()
+    persistence = ProductPersistence(FailingCollection(), history)
+
+    await persistence.flush([make_result("https://example.com", ("Milk", "10.00", "9.00"))])
+
+    assert history.documents == []
+
+
+@pytest.mark.asyncio
+async def test_enqueue_drops_results_when_queue_full():
+    persistence = ProductPersistence(FakeCollection(), FakeCollection(), max_queue_size=1)
+
+    assert persistence.enqueue(make_result("https://example.com", ("Milk", "10.00", "9.00")))
+    assert not persistence.enqueue(make_result("https://example2.com", ("Bread", "5.00", "5.00")))
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_buffered_results():
+    products, history = FakeCollection(), FakeCollection()
+    persistence = ProductPersistence(products, history, flush_interval=0.01)
+    await persistence.start()
+
+    persistence.enqueue(make_result("https://example.com", ("Milk", "10.00", "9.00")))
+    persistence.enqueue(make_result("https://example2.com", ("Bread", "5.00", "5.00")))
+    await persistence.stop()
+
+    assert sum(len(ops) for ops in products.bulk_writes) == 2
+    assert len(history.documents) == 2
+    assert len(products.indexes) == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_gives_up_on_unreachable_database():
+    persistence = ProductPersistence(HangingCollection(), FakeCollection(), flush_interval=0.01)
+    await persistence.start()
+
+    persistence.enqueue(make_result("https://example.com", ("Milk", "10.00", "9.00")))
+    await asyncio.sleep(0.05)
+    persistence.enqueue(make_result("https://example2.com", ("Bread", "5.00", "5.00")))
+    worker = persistence._worker
+    await asyncio.wait_for(persistence.stop(timeout=0.1), timeout=1)
+
+    assert worker.cancelled()